@@ -0,0 +1,58 @@
+# aggregates.py — Month × Item cube that the KPI cards and charts read instead of raw rows
+import numpy as np
+import pandas as pd
+
+SUM_COLS = ["Sales Quantity", "Sales Revenue", "COGS", "Profit", "Inventory Quantity", "Marketing Dollars"]
+KEYS = ["Month", "Item"]
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """Per (Month, Item): sums of the financial columns plus ``Rows`` (row count, for means)."""
+    cube = df.groupby(KEYS)[SUM_COLS].sum()
+    cube["Rows"] = df.groupby(KEYS).size()
+    return cube
+
+def update_cube(cube: pd.DataFrame, before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Cube for ``after`` from the cube for ``before``, re-aggregating only the cells whose rows changed.
+
+    ``after`` must be row-aligned with ``before`` (as ``apply_transform`` returns it); otherwise the
+    cube is rebuilt.
+    """
+    if len(before) != len(after) or not before.index.equals(after.index):
+        return build_cube(after)
+    changed = np.zeros(len(after), dtype=bool)
+    for col in SUM_COLS:
+        changed |= before[col].to_numpy() != after[col].to_numpy()
+    if not changed.any():
+        return cube
+    cells = pd.MultiIndex.from_frame(after.loc[changed, KEYS]).unique()
+    in_cells = pd.MultiIndex.from_frame(after[KEYS]).isin(cells)
+    fresh = build_cube(after[in_cells])
+    cube = cube.copy()
+    cube.loc[fresh.index, fresh.columns] = fresh
+    return cube
+
+def cube_frame(cube: pd.DataFrame, item: str = None) -> pd.DataFrame:
+    """Flat Month/Item/metric rows (optionally one item), usable wherever raw rows were grouped."""
+    flat = cube.reset_index()
+    return flat if item is None else flat[flat["Item"] == item]
+
+def kpi_totals(cube: pd.DataFrame, month: str = None):
+    """(revenue, profit, gm %, avg inventory per row, marketing) over all months or one month."""
+    cells = cube if month is None else cube[cube.index.get_level_values("Month") == month]
+    revenue = cells["Sales Revenue"].sum()
+    profit = cells["Profit"].sum()
+    gm = 0.0 if revenue == 0 else (revenue - cells["COGS"].sum()) / revenue * 100.0
+    rows = cells["Rows"].sum()
+    avg_inv = cells["Inventory Quantity"].sum() / rows if rows else float("nan")
+    return revenue, profit, gm, avg_inv, cells["Marketing Dollars"].sum()
+
+def cube_payload(cube: pd.DataFrame) -> dict:
+    """JSON-ready cube for the browser: ``months``, ``items`` and, per column, a months × items grid
+    (cells with no rows are 0). assets/views.js renders the KPI cards and charts from it."""
+    months = sorted(cube.index.get_level_values("Month").unique())
+    items = sorted(cube.index.get_level_values("Item").unique())
+    full = cube.reindex(pd.MultiIndex.from_product([months, items], names=KEYS), fill_value=0)
+    payload = {"months": months, "items": items}
+    for col in SUM_COLS + ["Rows"]:
+        payload[col] = full[col].to_numpy().reshape(len(months), len(items)).tolist()
+    return payload
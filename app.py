@@ -1,24 +1,151 @@
 # app.py (fixed: allow_duplicate on event-modal.style for confirm & cancel)
-from dash import Dash, html, dcc, Input, Output, State, ALL, ctx
+from dash import Dash, html, dcc, Input, Output, State, ALL, ctx, ClientsideFunction
+import hashlib
+import hmac
 import os
+from datetime import datetime
 
-import pandas as pd
+import plotly.io as pio
 from dash.exceptions import PreventUpdate
-from data_generation import generate_data
+from data_generation import month_anchor, student_seed
+from cohort import CohortStore
 from components import (
-    opening_message, post_start_message, raw_data_table,
-    kpi_cards, compact_amounts_and_changes, single_pie
+    opening_message, post_start_message, raw_data_table, raw_data_title,
+    kpi_cards, cached_compact, cached_single_pie, class_dashboard
 )
-from events_config import EVENTS
 from events_engine import apply_transform
-from dash import callback
-import threading
+from session_store import SessionStore
+from sections import SectionBusy, Sections
+from aggregates import build_cube, update_cube, cube_frame, cube_payload, kpi_totals
+from control_plane import SectionFull, UnlockScheduler
+from unlock_push import register_unlock_routes
+from table_query import frame_index
+from instrumentation import register_metrics, timed
+from download import MIMETYPES, download_href, register_download_routes
+from archive import register_archive_routes
+from dash import callback, no_update
+from flask import session as flask_session
 
 
 app = Dash(__name__, suppress_callback_exceptions=True)
 server = app.server
 app.title = "Business Intelligence for Operational Management – Discount4U Simulation"
 
+# Base data is built once per seed, section and worker (see datasets.py). A student id selects a
+# per-student seed; with COHORT_DIR set, the class's pre-built datasets are memory-mapped instead.
+COHORT = CohortStore.from_env()
+COHORT_SEED = COHORT.meta["cohort_seed"] if COHORT else int(os.environ.get("COHORT_SEED", "42"))
+COHORT_PARAMS = {**COHORT.meta["params"], "end_month": max(COHORT.meta["labels"]["Month"])} if COHORT else {}
+
+def _base_spec(student_id, section):
+    """Seed and generate_data params of a new session's base data, with the month anchor fixed."""
+    student_id = (student_id or "").strip()
+    if not student_id:
+        return {"seed": 42, "params": {"end_month": month_anchor()}, "section": section}
+    params = {**COHORT_PARAMS, "end_month": month_anchor(COHORT_PARAMS.get("end_month"))}
+    if COHORT is not None and student_id in COHORT:
+        return {"seed": COHORT.seed(student_id), "params": params, "student": student_id, "section": section}
+    return {"seed": student_seed(student_id, COHORT_SEED), "params": params, "student": student_id, "section": section}
+
+def _section_of(base):
+    section = SECTIONS.get(base.get("section"))
+    if section is None:
+        raise ValueError(f"Section {base.get('section')} is not configured (SECTIONS_FILE)")
+    return section
+
+def _load_base(base):
+    student = base.get("student")
+    if student is not None and COHORT is not None and student in COHORT:
+        return COHORT.frame(student)
+    return _section_of(base).datasets.get(base["seed"], **base["params"])
+
+# Class sections (see sections.py): each has its own PIN, week unlocks (shared by every worker
+# process, see control_plane.py), scenario pack, caches, quotas and dashboard counters.
+SECTIONS = Sections.from_env(_load_base)
+
+def _section(state):
+    section = SECTIONS.get((state or {}).get("section"))
+    if section is None:
+        raise PreventUpdate
+    return section
+
+# Instructor sign-in is remembered per section in Flask's signed session cookie; the browser's
+# instructor-control store only drives the UI and grants nothing. Set SECRET_KEY in production
+# (the fallback is derived from the section PINs so every worker agrees on it).
+server.secret_key = os.environ.get("SECRET_KEY") or hashlib.sha256(
+    "|".join(f"{s.key}:{s.pin}" for s in SECTIONS).encode()).hexdigest()
+
+def _pin_tag(section):
+    # changing a section's PIN signs its instructors out
+    return hashlib.sha256(f"{section.key}:{section.pin}".encode()).hexdigest()[:16]
+
+def _instructor_section(icontrol):
+    """The section of ``icontrol`` if this browser entered its PIN, else None."""
+    section = SECTIONS.get((icontrol or {}).get("section"))
+    if section is None or flask_session.get("instructor", {}).get(section.key) != _pin_tag(section):
+        return None
+    return section
+
+def _record_section(state, record):
+    """The section a session was started in (its base spec, not the browser's editable copy);
+    a browser claiming another section is ignored."""
+    section = _section_of(record.get("base") or {})
+    if SECTIONS.get(state.get("section")) is not section:
+        raise PreventUpdate
+    return section
+
+def _completed_weeks(record):
+    return {int(h["week"]) for h in record["history"]}
+
+def _seat(base):
+    """Who holds a section seat: the student id, else this browser (an id in the signed session
+    cookie, which survives reloads), so restarting never takes a second seat."""
+    if base.get("student"):
+        return f"student:{base['student']}"
+    return f"browser:{flask_session.setdefault('browser', SESSIONS.new_id())}"
+
+def _replay(record):
+    return _section_of(record["base"]).replayer.frame(record)
+
+def _watcher(key):
+    section = SECTIONS.get(key)
+    return section.watcher if section is not None else None
+
+# Scheduled unlocks of every section sit in one heap served by one timer thread per process.
+SCHEDULER = UnlockScheduler()
+for _s in SECTIONS:
+    SCHEDULER.load(_s.control, _s.unlock_at, _s.watcher.notify)
+
+# Session data lives server-side; the browser stores only {"sid", "section", "week", "rev",
+# "completed_weeks"}. Sessions keep their base spec and decisions; the current data is replayed
+# on load (see replay.py).
+SESSIONS = SessionStore.from_env(materialize=_replay)
+register_unlock_routes(server, _watcher)
+# Raw-data files are built only when a student asks for one (see download.py).
+register_download_routes(server, SESSIONS)
+
+# Callback latency / payload histograms on /metrics (METRICS=0 turns them off);
+# PROFILE_SAMPLE_RATE=0.01 also cProfiles 1% of callback requests into /metrics/profile.
+# Both need METRICS_TOKEN as a bearer token or an instructor PIN.
+if os.environ.get("METRICS", "1") != "0":
+    register_metrics(app, server, pins=lambda: [s.pin for s in SECTIONS])
+# KPI cards and charts are drawn in the browser (assets/views.js) from the session's aggregate
+# cube; CLIENTSIDE_VIEWS=0 renders them with server callbacks instead.
+CLIENTSIDE_VIEWS = os.environ.get("CLIENTSIDE_VIEWS", "1") != "0"
+KPI_VALUE_IDS = ["kpi-revenue", "kpi-profit", "kpi-gm", "kpi-avg-inv", "kpi-marketing"]
+
+def _session_record(state, materialize=True):
+    if not state or not state.get("sid"):
+        raise PreventUpdate
+    with timed("session_load"):
+        record = SESSIONS.load(state["sid"], state.get("rev"), materialize)
+    if record is None:
+        raise PreventUpdate
+    if materialize and "cube" not in record:  # sessions saved before the aggregate cube existed
+        with timed("cube_build"):
+            record["cube"] = build_cube(record["data"])
+    return record
+
 app.layout = html.Div([
     html.Header([
         html.H1("Business Intelligence for Operational Management Decision-Making", className="app-title"),
@@ -28,13 +155,19 @@ app.layout = html.Div([
     html.Main([
         opening_message(),
         html.Div([
+            dcc.Input(id="student-id", type="text", placeholder="Student ID (optional)", className="student-id",
+                      persistence=True, persistence_type="local"),
+            dcc.Input(id="section-code", type="text", placeholder="Section", className="student-id",
+                      persistence=True, persistence_type="local", style={} if len(SECTIONS) > 1 else {"display": "none"}),
             html.Button("Display Data", id="start-btn", className="start-btn"),
             dcc.Store(id="data-store"),
             dcc.Store(id="sim-state", storage_type="local"),
             dcc.Store(id="instructor-control", storage_type="local"),
             dcc.Store(id="active-event"),
-        dcc.Interval(id="poll-unlock", interval=4000, n_intervals=0),
-            dcc.Download(id="download-raw"),
+            dcc.Store(id="unlock-version"),
+            dcc.Store(id="view-cube"),
+            dcc.Store(id="view-cube-version"),  # lets the server skip unchanged cubes without receiving them
+            dcc.Store(id="figure-template", data=pio.templates[pio.templates.default].to_plotly_json()),
         ], className="start-row"),
         html.Div(id="post-start-msg"),
         html.Div(id="data-and-charts"),
@@ -62,7 +195,14 @@ app.layout = html.Div([
                             options=[{"label": f"Week {w}", "value": str(w)} for w in range(2,8)],
                             value=[],
                             inline=True, className="checklist"
-                        )
+                        ),
+                        html.Div(id="unlock-schedule", className="unlock-schedule")
+                    ], className="control"),
+                    html.Div([
+                        html.Label("Class dashboard"),
+                        html.Div(id="class-dashboard", children=html.P("Enter the instructor PIN to see class results.")),
+                        dcc.Interval(id="class-refresh", interval=5000, disabled=True),
+                        dcc.Store(id="class-stats-version"),
                     ], className="control"),
                     html.Div([
                         html.Label("Instructor notes for the last decision"),
@@ -93,17 +233,33 @@ app.layout = html.Div([
 @callback(
     Output("data-store", "data"),
     Output("post-start-msg", "children"),
-    Output("download-raw", "data"),
     Input("start-btn", "n_clicks"),
+    State("student-id", "value"),
+    State("section-code", "value"),
     prevent_initial_call=True,
 )
-def on_start(n):
-    df = generate_data()
-    return (
-        df.to_dict("records"),
-        post_start_message(),
-        dcc.send_data_frame(pd.DataFrame(df).to_csv, "discount4u_raw_data.csv", index=False),
-    )
+def on_start(n, student_id=None, section_code=None):
+    section = SECTIONS.get((section_code or "").strip())
+    if section is None:
+        return no_update, html.Div("Unknown section code; check it with your instructor.", className="highlight-text")
+    sid = SESSIONS.new_id()
+    base = _base_spec(student_id, section.key)
+    seat = _seat(base)
+    try:
+        with section.slot():  # a busy section refuses before any seat is taken
+            section.leases.acquire(seat)
+            with timed("base_frame"):
+                df = _load_base(base)
+            with timed("cube_build"):
+                cube = build_cube(df)
+    except (SectionFull, SectionBusy) as exc:
+        return no_update, html.Div(str(exc), className="highlight-text")
+    SESSIONS.create(df, sid, cube=cube, base=base, decisions=[], seat=seat)
+    links = html.Div(["Download raw data: "] + [
+        html.A(fmt.upper(), id=f"download-{fmt}", href=download_href(sid, 0, fmt), className="download-link")
+        for fmt in MIMETYPES
+    ], className="download-row")
+    return {"sid": sid, "section": section.key}, html.Div([post_start_message(), links])
 
 @callback(
     Output("sim-state", "data"),
@@ -111,12 +267,13 @@ def on_start(n):
     Input("data-store", "data"),
     prevent_initial_call=True
 )
-def init_sim_state(data_records):
-    if not data_records:
+def init_sim_state(data_ref):
+    if not data_ref:
         raise PreventUpdate
+    section = data_ref.get("section")
     return (
-        {"week": 1, "data": data_records, "history": [], "completed_weeks": []},
-        {"role": "student", "unlocked_weeks": {str(w): False for w in range(2,8)}}
+        {"sid": data_ref["sid"], "section": section, "week": 1, "rev": 0, "completed_weeks": []},
+        {"role": "student", "section": section, "unlocked_weeks": {str(w): False for w in range(2,8)}}
     )
 
 @callback(
@@ -124,10 +281,9 @@ def init_sim_state(data_records):
     Input("data-store", "data"),
     prevent_initial_call=True,
 )
-def render_charts(data_records):
-    if not data_records:
-        raise PreventUpdate
-    df = pd.DataFrame(data_records)
+def render_charts(data_ref):
+    record = _session_record(data_ref)
+    df = record["data"]
     months = sorted(df["Month"].unique().tolist())
     latest_month = months[-1]
     items = sorted(df["Item"].unique().tolist())
@@ -197,70 +353,115 @@ def render_charts(data_records):
     ], className="section-grid compact-section card")
 
     table_block = html.Div([
-        html.H3("Raw Data (12 months × 7 items)", className="section-title"),
-        raw_data_table(df)
+        html.H3(raw_data_title(df), className="section-title"),
+        raw_data_table(df, server_side=True)
     ], className="card table-card")
 
     return html.Div([
         html.Div([kpi_controls], className="card controls-card"),
-        html.Div(id="kpi-cards", className="card kpis-card"),
+        html.Div(kpi_cards(*kpi_totals(record["cube"]), value_ids=KPI_VALUE_IDS) if CLIENTSIDE_VIEWS else None,
+                 id="kpi-cards", className="card kpis-card"),
         pie_section,
         compact_section,
         table_block,
     ], className="stack")
 
-@callback(
-    Output("kpi-cards", "children"),
-    Input("sim-state", "data"),
-    Input("kpi-scope", "value"),
-    Input("pie-month", "value"),
-    Input("data-and-charts", "children"),
-)
-def update_kpis(sim_state, scope, month, _children):
-    if not sim_state or not sim_state.get("data"):
-        raise PreventUpdate
-    df = pd.DataFrame(sim_state["data"])
-    dff = df[df["Month"] == month] if scope == "lm" else df
-    revenue_total = dff["Sales Revenue"].sum()
-    profit_total = dff["Profit"].sum()
-    rev = dff["Sales Revenue"].sum()
-    gm = 0.0 if rev == 0 else (rev - dff["COGS"].sum()) / rev * 100.0
-    avg_inv = dff["Inventory Quantity"].mean()
-    marketing_total = dff["Marketing Dollars"].sum()
-    return kpi_cards(revenue_total, profit_total, gm, avg_inv, marketing_total)
-
-@callback(
-    Output("pie-graph", "figure"),
-    Input("sim-state", "data"),
-    Input("pie-month", "value"),
-    Input("pie-metric", "value"),
-    Input("data-and-charts", "children"),
-)
-def update_pie(sim_state, month, metric, _children):
-    if not sim_state or not sim_state.get("data"):
-        raise PreventUpdate
-    df = pd.DataFrame(sim_state["data"])
-    return single_pie(df, month, metric)
+if CLIENTSIDE_VIEWS:
+    @callback(
+        Output("view-cube", "data"),
+        Output("view-cube-version", "data"),
+        Input("sim-state", "data"),
+        State("view-cube-version", "data"),
+    )
+    def publish_view_cube(sim_state, current):
+        """Send the cube to the browser only when the session's data actually changed."""
+        record = _session_record(sim_state, materialize=False)
+        if current == record["version"]:
+            raise PreventUpdate
+        if "cube" not in record:
+            record = _session_record(sim_state)
+        return {"version": record["version"], **cube_payload(record["cube"])}, record["version"]
+
+    app.clientside_callback(
+        ClientsideFunction("views", "kpis"),
+        [Output(i, "children") for i in KPI_VALUE_IDS],
+        Input("view-cube", "data"),
+        Input("kpi-scope", "value"),
+        Input("pie-month", "value"),
+    )
+    app.clientside_callback(
+        ClientsideFunction("views", "pie"),
+        Output("pie-graph", "figure"),
+        Input("view-cube", "data"),
+        Input("pie-month", "value"),
+        Input("pie-metric", "value"),
+        State("figure-template", "data"),
+    )
+    app.clientside_callback(
+        ClientsideFunction("views", "compact"),
+        Output("compact-graph", "figure"),
+        Input("view-cube", "data"),
+        Input("compact-metrics", "value"),
+        Input("mom-range", "value"),
+        Input("compact-item", "value"),
+        State("figure-template", "data"),
+    )
+else:
+    @callback(
+        Output("kpi-cards", "children"),
+        Input("sim-state", "data"),
+        Input("kpi-scope", "value"),
+        Input("pie-month", "value"),
+        Input("data-and-charts", "children"),
+    )
+    def update_kpis(sim_state, scope, month, _children):
+        cube = _session_record(sim_state)["cube"]
+        return kpi_cards(*kpi_totals(cube, month if scope == "lm" else None))
+
+    @callback(
+        Output("pie-graph", "figure"),
+        Input("sim-state", "data"),
+        Input("pie-month", "value"),
+        Input("pie-metric", "value"),
+        Input("data-and-charts", "children"),
+    )
+    def update_pie(sim_state, month, metric, _children):
+        record = _session_record(sim_state)
+        return cached_single_pie(record["version"], cube_frame(record["cube"]), month, metric)
+
+    @callback(
+        Output("compact-graph", "figure"),
+        Input("sim-state", "data"),
+        Input("compact-metrics", "value"),
+        Input("mom-range", "value"),
+        Input("compact-item", "value"),
+        Input("data-and-charts", "children"),
+    )
+    def update_compact(sim_state, metrics_on, mom_range, item_scope, _children):
+        record = _session_record(sim_state)
+        return cached_compact(record["version"], cube_frame(record["cube"]), metrics_on, mom_range, item_scope)
 
 @callback(
-    Output("compact-graph", "figure"),
+    Output("raw-table", "data"),
+    Output("raw-table", "page_count"),
+    Output("raw-table", "page_current"),
+    Input("raw-table", "page_current"),
+    Input("raw-table", "page_size"),
+    Input("raw-table", "sort_by"),
+    Input("raw-table", "filter_query"),
     Input("sim-state", "data"),
-    Input("compact-metrics", "value"),
-    Input("mom-range", "value"),
-    Input("compact-item", "value"),
-    Input("data-and-charts", "children"),
 )
-def update_compact(sim_state, metrics_on, mom_range, item_scope, _children):
-    if not sim_state or not sim_state.get("data"):
+def page_raw_table(page, page_size, sort_by, filter_query, sim_state):
+    record = _session_record(sim_state)
+    if ctx.triggered_id == "raw-table" and "raw-table.page_current" not in ctx.triggered_prop_ids:
+        page = 0  # a new filter or sort starts from the first page
+    try:
+        return frame_index(record["version"], record["data"]).query(filter_query, sort_by, page, page_size)
+    except ValueError:
         raise PreventUpdate
-    df = pd.DataFrame(sim_state["data"])
-    label = "All Items (Total)"
-    if item_scope and item_scope != "ALL":
-        df = df[df["Item"] == item_scope]
-        label = item_scope
-    return compact_amounts_and_changes(df, metrics_on=metrics_on, mom_range=mom_range, label=label)
 
-PIN = os.environ.get("INSTRUCTOR_PIN", "D4U2025")
+# Bulk export / restore of a section's sessions for grading and archiving (see archive.py).
+register_archive_routes(server, SESSIONS, SECTIONS)
 
 @callback(
     Output("instructor-control", "data", allow_duplicate=True),
@@ -273,7 +474,15 @@ PIN = os.environ.get("INSTRUCTOR_PIN", "D4U2025")
 def set_instructor_role(n, pin, icontrol):
     if not icontrol:
         raise PreventUpdate
-    role = "instructor" if pin == PIN else "student"
+    section = _section(icontrol)
+    signed_in = dict(flask_session.get("instructor", {}))
+    if hmac.compare_digest(str(pin or "").encode(), section.pin.encode()):
+        signed_in[section.key] = _pin_tag(section)
+        role = "instructor"
+    else:
+        signed_in.pop(section.key, None)
+        role = "student"
+    flask_session["instructor"] = signed_in
     icontrol["role"] = role
     status = "Role: INSTRUCTOR" if role == "instructor" else "Role: STUDENT (invalid PIN)"
     return icontrol, status
@@ -284,28 +493,77 @@ def set_instructor_role(n, pin, icontrol):
     State("instructor-control", "data"),
     prevent_initial_call=True
 )
-def update_unlock_weeks(selected, icontrol, sim_state):
-    if not icontrol or icontrol.get("role") != "instructor":
+def update_unlock_weeks(selected, icontrol):
+    section = _instructor_section(icontrol)
+    if section is None:
         raise PreventUpdate
     allowed = {str(w): (str(w) in set(selected or [])) for w in range(2,8)}
+    section.control.set_unlocked(allowed)
+    section.watcher.notify()
     icontrol["unlocked_weeks"] = allowed
-    sim_state["unlocked_weeks"] = allowed
-    return icontrol, sim_state
+    return icontrol
 
 @callback(
-    Output({"type": "week-btn", "week": ALL}, "disabled"),
-    Input("sim-state", "data"),
+    Output("unlock-weeks", "value"),
+    Output("unlock-schedule", "children"),
     Input("instructor-control", "data"),
+    Input("unlock-version", "data"),
+    State("unlock-weeks", "value"),
     prevent_initial_call=True
 )
+def sync_unlock_controls(icontrol, _version, current):
+    """Keep the instructor's checklist on the section's actual unlocks (ticking a box must not
+    re-lock a week that opened on schedule) and list the schedule."""
+    section = _instructor_section(icontrol)
+    if section is None:
+        raise PreventUpdate
+    unlocked = sorted(w for w, on in section.control.unlocked().items() if on)
+    schedule = [
+        html.Li(f"Week {week}: {datetime.fromtimestamp(at):%a %Y-%m-%d %H:%M}" + (" (done)" if fired else ""))
+        for at, week, fired in section.control.schedule()
+    ]
+    return (no_update if sorted(current or []) == unlocked else unlocked,
+            html.Div([html.Small("Scheduled unlocks (server time):"), html.Ul(schedule)]) if schedule else None)
 
+@callback(
+    Output("class-refresh", "disabled"),
+    Input("instructor-control", "data"),
+)
+def toggle_class_refresh(icontrol):
+    return _instructor_section(icontrol) is None
+
+@callback(
+    Output("class-dashboard", "children"),
+    Output("class-stats-version", "data"),
+    Input("class-refresh", "n_intervals"),
+    Input("class-refresh", "disabled"),
+    State("instructor-control", "data"),
+    State("class-stats-version", "data"),
+    prevent_initial_call=True
+)
+def refresh_class_dashboard(_n, disabled, icontrol, current):
+    """Re-read the class aggregates only when a decision was recorded since the last refresh."""
+    section = None if disabled else _instructor_section(icontrol)
+    if section is None:
+        raise PreventUpdate
+    if current is not None and section.stats.version() == current:
+        raise PreventUpdate
+    summary = section.stats.summary()
+    return class_dashboard(summary, section.events), summary["version"]
 
-def control_week_buttons(sim_state, icontrol, _n):
+@callback(
+    Output({"type": "week-btn", "week": ALL}, "disabled"),
+    Input("sim-state", "data"),
+    Input("instructor-control", "data"),
+    Input("unlock-version", "data"),
+    prevent_initial_call=True
+)
+def control_week_buttons(sim_state, icontrol, _version):
     if not sim_state:
         return [True] * 6
-    with GLOBAL_LOCK:
-        unlocked = GLOBAL_CONTROL.get("unlocked_weeks", {})
-    completed = set(sim_state.get("completed_weeks", []))
+    record = _session_record(sim_state, materialize=False)
+    unlocked = _record_section(sim_state, record).control.unlocked()
+    completed = _completed_weeks(record)
     return [ (not unlocked.get(str(w), False)) or (w in completed) for w in range(2,8) ]
 
 
@@ -321,8 +579,6 @@ def control_week_buttons(sim_state, icontrol, _n):
     State("sim-state", "data"),
     prevent_initial_call=True
 )
-
-
 def open_event(week_clicks, icontrol, sim_state):
     if not sim_state:
         raise PreventUpdate
@@ -330,12 +586,13 @@ def open_event(week_clicks, icontrol, sim_state):
     if not isinstance(trigger, dict):
         raise PreventUpdate
     w = int(trigger.get("week"))
-    with GLOBAL_LOCK:
-        is_unlocked = GLOBAL_CONTROL.get("unlocked_weeks", {}).get(str(w), False)
-    if (not is_unlocked) or (w in set(sim_state.get("completed_weeks", []))):
+    record = _session_record(sim_state, materialize=False)
+    section = _record_section(sim_state, record)
+    is_unlocked = section.control.unlocked().get(str(w), False)
+    if (not is_unlocked) or (w in _completed_weeks(record)):
         raise PreventUpdate
 
-    ev = EVENTS.get(str(w))
+    ev = section.events.get(str(w))
     if not ev:
         raise PreventUpdate
     options = [{"label": c["label"], "value": c["id"]} for c in ev["choices"]]
@@ -355,11 +612,21 @@ def open_event(week_clicks, icontrol, sim_state):
 def confirm_choice(n, choice_id, active, sim_state):
     if not n or not choice_id or not active or not sim_state:
         raise PreventUpdate
-    week = active["week"]
-    ev = EVENTS[str(week)]
-    choice = next(c for c in ev["choices"] if c["id"] == choice_id)
-    df = pd.DataFrame(sim_state["data"])
-    new_df, delta, auto_feedback = apply_transform(df, choice["transform"])
+    week = int(active["week"])
+    record = _session_record(sim_state)
+    section = _record_section(sim_state, record)
+    # active-event is browser state too: the week must still be open and undecided
+    if not section.control.unlocked().get(str(week), False) or week in _completed_weeks(record):
+        raise PreventUpdate
+    ev = section.events.get(str(week))
+    choice = next((c for c in ev["choices"] if c["id"] == choice_id), None) if ev else None
+    if choice is None:
+        raise PreventUpdate
+    try:
+        with section.slot(), timed("transform"):
+            new_df, delta, auto_feedback = apply_transform(record["data"], choice["transform"], section.transforms)
+    except SectionBusy as exc:
+        return no_update, html.P(str(exc), className="highlight-text"), {"display": "block"}, no_update
 
     feedback_html = html.Div([
         html.H4(f"Week {week}: Decision Outcome"),
@@ -372,7 +639,7 @@ def confirm_choice(n, choice_id, active, sim_state):
         html.P(auto_feedback, className="highlight-text")
     ])
 
-    history = sim_state.get("history", [])
+    history = list(record["history"])
     history.append({
         "week": week,
         "event_id": ev["id"],
@@ -381,13 +648,21 @@ def confirm_choice(n, choice_id, active, sim_state):
         "student_feedback": choice["student_feedback"],
         "instructor_notes": ""
     })
-    completed = set(sim_state.get("completed_weeks", []))
-    completed.add(week)
+    completed = _completed_weeks(record) | {week}
+    rev = record["rev"] + 1
+    with timed("cube_update"):
+        cube = update_cube(record["cube"], record["data"], new_df)
+    if "decisions" in record:
+        state = section.replayer.advance(record, week, choice["transform"], new_df)
+    else:  # sessions saved before decisions were recorded keep their frame
+        state = {"data": new_df}
+    SESSIONS.save(sim_state["sid"], {**state, "cube": cube, "history": history, "rev": rev})
+    section.leases.renew(record.get("seat") or sim_state["sid"])
+    section.stats.record(sim_state["sid"], week, choice_id, delta["Profit %"], record.get("base", {}).get("student"))
     new_state = {
         **sim_state,
         "week": max(sim_state.get("week", 1), week),
-        "data": new_df.to_dict("records"),
-        "history": history,
+        "rev": rev,
         "completed_weeks": sorted(list(completed))
     }
     return new_state, feedback_html, {"display": "block"}, {"display": "none"}
@@ -412,11 +687,74 @@ def cancel_modal(n):
 def save_notes(n, notes, sim_state):
     if not n or not sim_state:
         raise PreventUpdate
-    hist = sim_state.get("history", [])
-    if hist:
-        hist[-1]["instructor_notes"] = notes or ""
-    sim_state["history"] = hist
-    return sim_state
+    record = _session_record(sim_state)
+    hist = list(record["history"])
+    if not hist:
+        return no_update
+    hist[-1] = {**hist[-1], "instructor_notes": notes or ""}
+    rev = record["rev"] + 1
+    SESSIONS.save(sim_state["sid"], {**record, "history": hist, "rev": rev})
+    return {**sim_state, "rev": rev}
+
+# Keep the download links pointing at the current revision of the session.
+app.clientside_callback(
+    """
+    function(state) {
+        if (!state || !state.sid) { return window.dash_clientside.no_update; }
+        return ["csv", "parquet", "xlsx"].map(function(fmt) {
+            return "/download/" + state.sid + "." + fmt + "?rev=" + (state.rev || 0);
+        });
+    }
+    """,
+    [Output(f"download-{fmt}", "href") for fmt in MIMETYPES],
+    Input("sim-state", "data"),
+)
+
+# Subscribe once per page and section to unlock-version pushes (SSE, falling back to ETag
+# long-polling); control_week_buttons only re-runs when the instructor actually changes the unlocks.
+app.clientside_callback(
+    """
+    function(state, id) {
+        var section = (state && state.section) || "default";
+        if (window._unlockFeed === section) { return window.dash_clientside.no_update; }
+        window._unlockFeed = section;
+        if (window._unlockSource) { window._unlockSource.close(); }
+        var query = "section=" + encodeURIComponent(section);
+        var publish = function(v) { window.dash_clientside.set_props(id, {data: v}); };
+        var longPoll = function(etag) {
+            if (window._unlockFeed !== section) { return; }
+            fetch("/unlock/poll?wait=25&" + query, {headers: etag ? {"If-None-Match": etag} : {}, cache: "no-store"})
+                .then(function(r) {
+                    if (r.status === 304) { return longPoll(etag); }
+                    if (r.status !== 200) { throw new Error(r.status); }
+                    return r.json().then(function(body) {
+                        publish(body.version);
+                        longPoll(r.headers.get("ETag"));
+                    });
+                })
+                .catch(function() { setTimeout(function() { longPoll(etag); }, 5000); });
+        };
+        if (window.EventSource) {
+            var es = window._unlockSource = new EventSource("/unlock/events?" + query);
+            es.onmessage = function(e) { publish(parseInt(e.data, 10)); };
+            es.onerror = function() {
+                if (es.readyState === EventSource.CLOSED) { longPoll(null); }
+            };
+        } else {
+            longPoll(null);
+        }
+        return window.dash_clientside.no_update;
+    }
+    """,
+    Output("unlock-version", "data"),
+    Input("sim-state", "data"),
+    State("unlock-version", "id"),
+)
+
+# Dash finishes registering callbacks lazily on the first request, which races when several
+# requests reach a fresh worker at once; send that first request at import through Flask's
+# test client instead (public API, unlike calling Dash's private setup hook).
+server.test_client().get(app.config.routes_pathname_prefix + "_dash-dependencies")
 
 if __name__ == "__main__":
     app.run(debug=True)
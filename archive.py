@@ -0,0 +1,408 @@
+# archive.py — bulk export of every session's decision log and final KPIs, and restore by replay
+#
+#   python archive.py export term.ndjson              # or term.parquet (needs pyarrow)
+#   python archive.py export mon-am.ndjson --section mon-am
+#   python archive.py import term.ndjson
+#
+# Over HTTP, POST /archive/sessions.ndjson spools the upload and runs that import in a separate
+# process (restoring is CPU-bound pandas work that would stall every stream on a gevent worker);
+# GET /archive/jobs/<id> reports its progress from the control database.
+#
+# Both directions handle one session at a time, so a whole term never sits in memory. NDJSON holds
+# one session per line; Parquet holds one row per decision (grading-friendly) with the session's
+# columns repeated. Import rebuilds each session from its base spec by replaying the decisions
+# through its section's apply_transform pack, and keeps the archived session id and rev so open
+# browsers reconnect.
+import argparse
+import hmac
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from flask import Response, abort, jsonify, request
+
+from aggregates import build_cube, kpi_totals, update_cube
+from dbconn import pool
+from events_engine import apply_transform
+from sections import DEFAULT
+
+KPI_NAMES = ["revenue", "profit", "gm_pct", "avg_inventory", "marketing"]
+DELTA_KEYS = ["Sales Quantity", "Sales Revenue", "COGS", "Profit", "Inventory Quantity", "Marketing Dollars",
+              "Revenue %", "Profit %"]
+BATCH_SESSIONS = 200  # sessions per Parquet row group
+
+
+def _kpis(cube, month: str = None) -> Dict[str, float]:
+    return {k: round(float(v), 2) for k, v in zip(KPI_NAMES, kpi_totals(cube, month))}
+
+
+def _decisions(record: Dict[str, Any], events: Dict[str, Any]) -> List[list]:
+    """Recorded decisions, or (sessions saved before they were recorded) derived from history."""
+    if "decisions" in record:
+        return [list(d) for d in record["decisions"]]
+    out = []
+    for h in record.get("history", []):
+        choice = next(c for c in events[str(h["week"])]["choices"] if c["id"] == h["choice"])
+        out.append([int(h["week"]), choice["transform"]])
+    return out
+
+
+def export_entry(sid: str, record: Dict[str, Any], events: Dict[str, Any]) -> Dict[str, Any]:
+    """One session's archive entry: base spec, decisions, history and KPIs of its current data."""
+    cube = record.get("cube")
+    if cube is None:
+        cube = build_cube(record["data"])
+    base = record.get("base")
+    return {
+        "sid": sid,
+        "student": (base or {}).get("student"),
+        "base": base,
+        "decisions": _decisions(record, events),
+        "history": record.get("history", []),
+        "rev": int(record.get("rev", 0)),
+        "version": record.get("version"),
+        "kpis": _kpis(cube),
+        "kpis_last_month": _kpis(cube, max(cube.index.get_level_values("Month"))),
+    }
+
+
+def _section_key(base) -> str:
+    return (base or {}).get("section") or DEFAULT
+
+
+def export_entries(sessions, sections, only: str = None) -> Iterator[Dict[str, Any]]:
+    """Entries of every stored session, or of section ``only``'s sessions."""
+    for sid, record in sessions.scan():
+        key = _section_key(record.get("base"))
+        section = sections.get(key)
+        if section is None or (only is not None and key != only):
+            continue
+        yield export_entry(sid, record, section.events)
+
+
+def ndjson_lines(entries: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for entry in entries:
+        yield json.dumps(entry, separators=(",", ":")) + "\n"
+
+
+def _decision_rows(entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flat Parquet rows for one entry: one per decision, or one with no week if there are none."""
+    session = {
+        "sid": entry["sid"], "student": entry["student"], "base": json.dumps(entry["base"]),
+        "rev": entry["rev"], "version": entry["version"],
+        **{f"kpi_{k}": v for k, v in entry["kpis"].items()},
+        **{f"kpi_last_month_{k}": v for k, v in entry["kpis_last_month"].items()},
+    }
+    rows = []
+    for (week, transform), h in zip(entry["decisions"], entry["history"]):
+        delta = h.get("delta_summary", {})
+        rows.append({**session, "week": week, "event_id": h.get("event_id"), "choice": h.get("choice"),
+                     "transform": transform, "instructor_notes": h.get("instructor_notes", ""),
+                     **{f"delta_{k}": delta.get(k) for k in DELTA_KEYS}})
+    return rows or [{**session, "week": None, "event_id": None, "choice": None, "transform": None,
+                     "instructor_notes": None, **{f"delta_{k}": None for k in DELTA_KEYS}}]
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("Parquet archives need pyarrow (pip install pyarrow)") from exc
+    return pa, pq
+
+
+def _schema(pa):
+    text = ["sid", "student", "base", "version"]
+    floats = [f"kpi_{k}" for k in KPI_NAMES] + [f"kpi_last_month_{k}" for k in KPI_NAMES]
+    decision = [("week", pa.int64()), ("event_id", pa.string()), ("choice", pa.string()),
+                ("transform", pa.string()), ("instructor_notes", pa.string())]
+    return pa.schema([(c, pa.string()) for c in text] + [("rev", pa.int64())] + [(c, pa.float64()) for c in floats]
+                     + decision + [(f"delta_{k}", pa.float64()) for k in DELTA_KEYS])
+
+
+def write_parquet(entries: Iterable[Dict[str, Any]], path: str) -> int:
+    """Write entries as one row per decision, ``BATCH_SESSIONS`` sessions per row group."""
+    pa, pq = _pyarrow()
+    schema = _schema(pa)
+    rows, count = [], 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for entry in entries:
+            rows.extend(_decision_rows(entry))
+            count += 1
+            if count % BATCH_SESSIONS == 0:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                rows = []
+        if rows:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+    return count
+
+
+def read_ndjson(lines: Iterable) -> Iterator[Dict[str, Any]]:
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def read_parquet(path: str) -> Iterator[Dict[str, Any]]:
+    """Entries back from ``write_parquet`` output (rows of a session are contiguous)."""
+    _, pq = _pyarrow()
+    current = None
+    for batch in pq.ParquetFile(path).iter_batches():
+        for row in batch.to_pylist():
+            if current is None or row["sid"] != current["sid"]:
+                if current is not None:
+                    yield current
+                current = {"sid": row["sid"], "base": json.loads(row["base"]), "rev": row["rev"],
+                           "version": row["version"], "decisions": [], "history": []}
+            if row["week"] is not None:
+                current["decisions"].append([int(row["week"]), row["transform"]])
+                current["history"].append({"week": int(row["week"]), "instructor_notes": row["instructor_notes"] or ""})
+    if current is not None:
+        yield current
+
+
+def _check_entry(entry) -> None:
+    """Raise ValueError unless ``entry`` has the shape export_entry writes."""
+    if not isinstance(entry, dict):
+        raise ValueError(f"Entry is not an object: {str(entry)[:80]!r}")
+    sid = entry.get("sid")
+    if not isinstance(sid, str) or not sid:
+        raise ValueError(f"Entry without a session id: {str(entry)[:80]!r}")
+    base = entry.get("base")
+    if base is not None and not (isinstance(base, dict) and "seed" in base and isinstance(base.get("params", {}), dict)):
+        raise ValueError(f"{sid}: malformed base spec")
+    decisions = entry.get("decisions", [])
+    if not isinstance(decisions, list) or not all(isinstance(d, list) and len(d) == 2 for d in decisions):
+        raise ValueError(f"{sid}: decisions must be [week, transform] pairs")
+    history = entry.get("history", [])
+    if not isinstance(history, list) or not all(isinstance(h, dict) and "week" in h for h in history):
+        raise ValueError(f"{sid}: every history item needs a week")
+    for value in [w for w, _ in decisions] + [h["week"] for h in history] + [entry.get("rev", 0)]:
+        try:
+            int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{sid}: weeks and rev must be integers, got {value!r}") from None
+
+
+def restore(sessions, section, entry: Dict[str, Any]) -> bool:
+    """Rebuild and save one archived session of ``section`` under its original id by replaying its
+    decisions.
+
+    Returns whether the replayed data matches the archived version (False after e.g. a change to
+    the scenario pack); raises ValueError when the entry can't be replayed.
+    """
+    _check_entry(entry)
+    events, replayer = section.events, section.replayer
+    base = entry.get("base")
+    if not base:
+        raise ValueError(f"{entry.get('sid')}: no base spec (session saved before decisions were recorded)")
+    notes = {int(h["week"]): h.get("instructor_notes", "") for h in entry.get("history", [])}
+    df = replayer.load_base(base)
+    cube = build_cube(df)
+    record: Dict[str, Any] = {"base": base, "decisions": [], "data": df}
+    history = []
+    for week, transform in entry.get("decisions", []):
+        ev = events.get(str(week))
+        choice = next((c for c in ev.get("choices", []) if c["transform"] == transform), None) if ev else None
+        if choice is None:
+            raise ValueError(f"{entry['sid']}: week {week} has no choice {transform!r}")
+        new_df, delta, _ = apply_transform(df, transform, section.transforms)
+        cube = update_cube(cube, df, new_df)
+        record = replayer.advance(record, week, transform, new_df)
+        history.append({
+            "week": int(week),
+            "event_id": ev["id"],
+            "choice": choice["id"],
+            "delta_summary": delta,
+            "student_feedback": choice["student_feedback"],
+            "instructor_notes": notes.get(int(week), ""),
+        })
+        df = new_df
+    saved = sessions.save(entry["sid"], {**record, "cube": cube, "history": history, "rev": int(entry.get("rev", 0))})
+    return entry.get("version") in (None, saved["version"])
+
+
+def import_entries(sessions, sections, entries: Iterable[Dict[str, Any]], only: str = None) -> Dict[str, Any]:
+    """Restore every entry (only section ``only``'s when given) into its section; returns counts and
+    the errors of entries that were skipped."""
+    counts: Dict[str, Any] = {"restored": 0, "changed": 0, "skipped": 0, "errors": []}
+    for entry in entries:
+        try:
+            _check_entry(entry)
+            key = _section_key(entry.get("base"))
+            if only is not None and key != only:
+                raise ValueError(f"{entry.get('sid')}: belongs to section {key}, not {only}")
+            section = sections.get(key)
+            if section is None:
+                raise ValueError(f"{entry.get('sid')}: section {key} is not configured")
+            same = restore(sessions, section, entry)
+        except ValueError as exc:
+            counts["skipped"] += 1
+            counts["errors"].append(str(exc))
+            continue
+        except (KeyError, TypeError) as exc:  # anything _check_entry missed still skips only this entry
+            counts["skipped"] += 1
+            counts["errors"].append(f"{entry.get('sid')}: malformed entry ({exc!r})")
+            continue
+        counts["restored"] += 1
+        counts["changed"] += not same
+    return counts
+
+
+class RestoreJobs:
+    """Status of restores started over HTTP, kept in a section's control database so whichever
+    worker is asked can report it."""
+
+    def __init__(self, path: str):
+        self._db = pool(path).connection
+        with self._db() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS restore_jobs (id TEXT PRIMARY KEY, section TEXT NOT NULL,"
+                " status TEXT NOT NULL, result TEXT, started REAL NOT NULL, finished REAL)")
+
+    def create(self, section: str) -> str:
+        job = uuid.uuid4().hex
+        with self._db() as conn:
+            conn.execute("INSERT INTO restore_jobs (id, section, status, started) VALUES (?, ?, 'running', ?)",
+                         (job, section, time.time()))
+        return job
+
+    def finish(self, job: str, counts: Dict[str, Any] = None, error: str = None) -> None:
+        result = {"error": error} if error is not None else counts
+        with self._db() as conn:
+            conn.execute("UPDATE restore_jobs SET status = ?, result = ?, finished = ? WHERE id = ?",
+                         ("failed" if error is not None else "done", json.dumps(result), time.time(), job))
+
+    def get(self, job: str, section: str) -> Optional[Dict[str, Any]]:
+        with self._db() as conn:
+            row = conn.execute("SELECT status, result, started, finished FROM restore_jobs WHERE id = ? AND section = ?",
+                               (job, section)).fetchone()
+        if row is None:
+            return None
+        status, result, started, finished = row
+        return {"job": job, "status": status, "started": started, "finished": finished,
+                **(json.loads(result) if result else {})}
+
+
+def register_archive_routes(server, sessions, sections) -> None:
+    """Add ``GET /archive/sessions.ndjson|.parquet``, ``POST /archive/sessions.ndjson`` (starts a
+    restore job, 202) and ``GET /archive/jobs/<id>`` for one section (``?section=``, default
+    "default"), for callers sending that section's instructor PIN in ``X-Instructor-Pin``."""
+    jobs = {section.key: RestoreJobs(section.control.path) for section in sections}
+
+    def _section():
+        key = request.args.get("section") or DEFAULT
+        section = sections.get(key)
+        if section is None:
+            abort(404)
+        if not hmac.compare_digest(request.headers.get("X-Instructor-Pin", "").encode(), section.pin.encode()):
+            abort(403)
+        return key
+
+    @server.route("/archive/sessions.ndjson", methods=["GET"])
+    def archive_ndjson():
+        key = _section()
+        return Response(ndjson_lines(export_entries(sessions, sections, key)), mimetype="application/x-ndjson", headers={
+            "Content-Disposition": 'attachment; filename="sessions.ndjson"', "Cache-Control": "no-store"})
+
+    @server.route("/archive/sessions.parquet", methods=["GET"])
+    def archive_parquet():
+        key = _section()
+        fd, path = tempfile.mkstemp(suffix=".parquet")
+        os.close(fd)
+        try:
+            write_parquet(export_entries(sessions, sections, key), path)
+        except RuntimeError as exc:
+            os.unlink(path)
+            abort(501, description=str(exc))
+
+        def chunks():
+            try:
+                with open(path, "rb") as fh:
+                    yield from iter(lambda: fh.read(64 * 1024), b"")
+            finally:
+                os.unlink(path)
+
+        return Response(chunks(), mimetype="application/vnd.apache.parquet", headers={
+            "Content-Disposition": 'attachment; filename="sessions.parquet"', "Cache-Control": "no-store"})
+
+    @server.route("/archive/sessions.ndjson", methods=["POST"])
+    def restore_ndjson():
+        key = _section()
+        if sessions.backend is None:  # the import process could not reach this worker's memory
+            abort(409, description="Restoring over HTTP needs SESSION_BACKEND=sqlite")
+        fd, path = tempfile.mkstemp(suffix=".ndjson")
+        with os.fdopen(fd, "wb") as fh:
+            shutil.copyfileobj(request.stream, fh, 64 * 1024)
+        job = jobs[key].create(key)
+        proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "import", path, "--section", key,
+                                 "--job", job])
+        threading.Thread(target=proc.wait, daemon=True).start()  # reap it
+        return jsonify({"job": job, "status": "running"}), 202, {"Location": f"/archive/jobs/{job}?section={key}"}
+
+    @server.route("/archive/jobs/<job>", methods=["GET"])
+    def restore_status(job):
+        key = _section()
+        status = jobs[key].get(job, key)
+        if status is None:
+            abort(404)
+        return jsonify(status)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Export or restore every session (uses the app's session settings).")
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("path", help="archive file, .ndjson or .parquet")
+    parser.add_argument("--section", default=None, help="only this section's sessions (default: all)")
+    parser.add_argument("--job", default=None, help=argparse.SUPPRESS)  # restore route: record, remove the upload
+    args = parser.parse_args(argv)
+    from app import SECTIONS, SESSIONS  # the configured stores (SESSION_BACKEND, SECTIONS_FILE, ...)
+
+    if args.job:
+        jobs = RestoreJobs(SECTIONS.get(args.section).control.path)
+        try:
+            with open(args.path) as fh:
+                counts = import_entries(SESSIONS, SECTIONS, read_ndjson(fh), args.section)
+        except Exception as exc:  # reported through the job, not a traceback nobody sees
+            jobs.finish(args.job, error=f"{type(exc).__name__}: {exc}")
+            raise
+        else:
+            jobs.finish(args.job, counts)
+        finally:
+            os.unlink(args.path)
+        return
+
+    parquet = args.path.endswith(".parquet")
+    if args.action == "export":
+        entries = export_entries(SESSIONS, SECTIONS, args.section)
+        if parquet:
+            count = write_parquet(entries, args.path)
+        else:
+            count = 0
+            with open(args.path, "w") as fh:
+                for line in ndjson_lines(entries):
+                    fh.write(line)
+                    count += 1
+        print(f"{count} sessions -> {args.path}")
+        return
+    if parquet:
+        counts = import_entries(SESSIONS, SECTIONS, read_parquet(args.path), args.section)
+    else:
+        with open(args.path) as fh:
+            counts = import_entries(SESSIONS, SECTIONS, read_ndjson(fh), args.section)
+    print(f"{counts['restored']} restored ({counts['changed']} with different data), {counts['skipped']} skipped")
+    for error in counts["errors"]:
+        print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+// views.js — KPI cards, pie and compact chart rendered in the browser from the "view-cube" store
+// (aggregates.cube_payload), so view toggles never round-trip to the server. Mirrors
+// components.kpi_cards / single_pie / compact_amounts_and_changes.
+(function() {
+    var ALL_METRICS = ["qty", "revenue", "profit", "inventory"];
+    var LINES = [
+        ["qty", "Sales Quantity", "Quantity", "#0d6efd"],
+        ["revenue", "Sales Revenue", "Revenue", "#198754"],
+        ["profit", "Profit", "Profit", "#6f42c1"],
+        ["inventory", "Inventory Quantity", "Inventory", "#fd7e14"],
+    ];
+
+    function number(x) {
+        return x.toLocaleString("en-US", {maximumFractionDigits: 0});
+    }
+
+    function currency(x) {
+        return "$" + number(x);
+    }
+
+    function range(n) {
+        var out = [];
+        for (var i = 0; i < n; i++) { out.push(i); }
+        return out;
+    }
+
+    // Sum of column ``col`` over the given month and item indices.
+    function total(cube, col, months, items) {
+        var s = 0;
+        months.forEach(function(m) {
+            items.forEach(function(i) { s += cube[col][m][i]; });
+        });
+        return s;
+    }
+
+    function kpis(cube, scope, month) {
+        if (!cube) { throw window.dash_clientside.PreventUpdate; }
+        var months = range(cube.months.length);
+        if (scope === "lm") {
+            var m = cube.months.indexOf(month);
+            months = m < 0 ? [] : [m];
+        }
+        var items = range(cube.items.length);
+        var revenue = total(cube, "Sales Revenue", months, items);
+        var rows = total(cube, "Rows", months, items);
+        var gm = revenue === 0 ? 0 : (revenue - total(cube, "COGS", months, items)) / revenue * 100;
+        return [
+            currency(revenue),
+            currency(total(cube, "Profit", months, items)),
+            gm.toFixed(1) + "%",
+            rows ? number(total(cube, "Inventory Quantity", months, items) / rows) : "nan",
+            currency(total(cube, "Marketing Dollars", months, items)),
+        ];
+    }
+
+    function pie(cube, month, metric, template) {
+        if (!cube) { throw window.dash_clientside.PreventUpdate; }
+        var m = cube.months.indexOf(month);
+        var slices = m < 0 ? [] : cube.items
+            .map(function(item, i) { return [item, cube[metric][m][i], cube.Rows[m][i]]; })
+            .filter(function(s) { return s[2] > 0; });
+        if (!slices.length) {
+            return {data: [], layout: {template: template, margin: {l: 0, r: 0, t: 10, b: 0}}};
+        }
+        slices.sort(function(a, b) { return b[1] - a[1]; });
+        return {
+            data: [{
+                type: "pie", hole: 0.45, textinfo: "percent+label", name: "", legendgroup: "", showlegend: true,
+                labels: slices.map(function(s) { return s[0]; }),
+                values: slices.map(function(s) { return s[1]; }),
+                domain: {x: [0, 1], y: [0, 1]},
+                hovertemplate: "Item=%{label}<br>" + metric + "=%{value}<extra></extra>",
+            }],
+            layout: {
+                template: template,
+                margin: {l: 10, r: 10, t: 30, b: 10},
+                legend: {title: {text: "Item"}, tracegroupgap: 0},
+            },
+        };
+    }
+
+    function compact(cube, metricsOn, momRange, itemScope, template) {
+        if (!cube) { throw window.dash_clientside.PreventUpdate; }
+        metricsOn = metricsOn || ALL_METRICS;
+        var scoped = itemScope && itemScope !== "ALL";
+        var label = scoped ? itemScope : "All Items (Total)";
+        var items = scoped ? [cube.items.indexOf(itemScope)].filter(function(i) { return i >= 0; })
+                           : range(cube.items.length);
+        // Months with at least one row in scope, in calendar order ("%Y-%m" sorts lexically).
+        var months = range(cube.months.length).filter(function(m) {
+            return total(cube, "Rows", [m], items) > 0;
+        });
+        var x = months.map(function(m) { return cube.months[m]; });
+        var series = {};
+        LINES.forEach(function(line) {
+            series[line[1]] = months.map(function(m) { return total(cube, line[1], [m], items); });
+        });
+        series["Inventory Quantity"] = series["Inventory Quantity"].map(function(v, j) {
+            return v / total(cube, "Rows", [months[j]], items);
+        });
+        var revenue = series["Sales Revenue"];
+        var mom = revenue.map(function(v, j) {
+            return j === 0 || revenue[j - 1] === 0 ? null : (v / revenue[j - 1] - 1) * 100;
+        });
+
+        var data = [];
+        LINES.forEach(function(line) {
+            if (metricsOn.indexOf(line[0]) < 0) { return; }
+            data.push({
+                type: "scatter", mode: "lines+markers", xaxis: "x", yaxis: "y",
+                x: x, y: series[line[1]], name: line[2] + " — " + label,
+                line: {color: line[3], width: 2},
+            });
+        });
+        data.push({
+            type: "bar", xaxis: "x", yaxis: "y2", x: x, y: mom,
+            name: "Revenue MoM % — " + label, marker: {color: "#9CA3AF"}, opacity: 0.6,
+        });
+        [["Upper Range", momRange], ["Lower Range", -momRange]].forEach(function(ref) {
+            data.push({
+                type: "scatter", mode: "lines", xaxis: "x", yaxis: "y2", showlegend: false,
+                x: x, y: x.map(function() { return ref[1]; }), name: ref[0],
+                line: {color: "#9CA3AF", dash: "dot"},
+            });
+        });
+
+        var y2Abs = mom.reduce(function(acc, v) { return v === null ? acc : Math.max(acc, Math.abs(v)); }, 0);
+        var y2Max = Math.max(10, Math.min(200, Math.max(momRange, y2Abs)));
+        return {
+            data: data,
+            layout: {
+                template: template,
+                xaxis: {anchor: "y", domain: [0, 0.94]},
+                yaxis: {anchor: "x", domain: [0, 1], title: {text: "Amounts"}},
+                yaxis2: {
+                    anchor: "x", overlaying: "y", side: "right", title: {text: "MoM %"},
+                    range: [-y2Max, y2Max], zeroline: true, zerolinecolor: "#9CA3AF",
+                },
+                title: {text: "Compact View — " + label, x: 0.01, xanchor: "left"},
+                legend: {orientation: "h", yanchor: "bottom", y: 1.02, xanchor: "right", x: 1},
+                margin: {l: 10, r: 10, t: 40, b: 0},
+                barmode: "overlay",
+                hovermode: "x unified",
+            },
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        views: {kpis: kpis, pie: pie, compact: compact},
+    });
+})();
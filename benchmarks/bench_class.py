@@ -0,0 +1,214 @@
+"""Simulated class session against ``app:server`` under gunicorn.
+
+Each synthetic student walks the real callback flow over ``/_dash-update-component``: Display
+Data (start, init, render, view cube, table), then for weeks 2-7 poll the unlocks, open the
+event, confirm a choice, refresh the view cube and re-sort the table. Chart toggles run in the
+browser unless ``--server-views`` starts the app with CLIENTSIDE_VIEWS=0, in which case the KPI,
+pie and compact callbacks are requested as well. Every week is unlocked up front in a temporary
+UnlockStore; sessions use a temporary SQLite file.
+
+    python benchmarks/bench_class.py --students 60 --concurrency 30 --configs 4xgevent 1x8 4x2
+"""
+import argparse
+import http.client
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from bench_unlock import ROOT, parse_config, start_server, stop_server
+
+sys.path.insert(0, ROOT)
+from control_plane import WEEKS, UnlockStore  # noqa: E402
+
+OK = (200, 204)  # 204: the callback raised PreventUpdate
+
+
+def _output_key(deps, *parts) -> str:
+    """Output key of the one callback whose output mentions every part."""
+    found = [d["output"] for d in deps if all(p in d["output"] for p in parts)]
+    if len(found) != 1:
+        raise RuntimeError(f"expected one callback for {parts}, found {found}")
+    return found[0]
+
+
+def _outputs(key: str):
+    """``outputs`` of a request for ``key`` (``..a.b...c.d..`` or ``a.b``)."""
+    specs = key[2:-2].split("...") if key.startswith("..") else [key]
+    outs = []
+    for spec in specs:
+        cid, prop = spec.rsplit(".", 1)
+        outs.append({"id": cid, "property": prop.split("@")[0]})
+    return outs if key.startswith("..") else outs[0]
+
+
+def _week_id(week: int) -> dict:
+    return {"type": "week-btn", "week": week}
+
+
+def _week_prop(week: int, prop: str) -> str:
+    return json.dumps(_week_id(week), sort_keys=True, separators=(",", ":")) + "." + prop
+
+
+def _p(cid, prop: str, value=None) -> dict:
+    return {"id": cid, "property": prop, "value": value}
+
+
+class Student:
+    def __init__(self, port: int, keys: dict, index: int, server_views: bool):
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        self.keys, self.index, self.server_views = keys, index, server_views
+        self.month = time.strftime("%Y-%m")  # latest month label of the generated data
+        self.timings = []  # (step, seconds)
+
+    def call(self, step: str, inputs: list, state: list = (), changed: str = None, outputs=None) -> dict:
+        key = self.keys[step]
+        body = json.dumps({
+            "output": key,
+            "outputs": _outputs(key) if outputs is None else outputs,
+            "inputs": inputs,
+            "state": list(state),
+            "changedPropIds": [changed or f"{inputs[0]['id']}.{inputs[0]['property']}"],
+        })
+        t0 = time.perf_counter()
+        self.conn.request("POST", "/_dash-update-component", body, {"Content-Type": "application/json"})
+        resp = self.conn.getresponse()
+        raw = resp.read()
+        self.timings.append((step, time.perf_counter() - t0))
+        if resp.status not in OK:
+            raise RuntimeError(f"{step}: HTTP {resp.status} {raw[:200]!r}")
+        return json.loads(raw)["response"] if resp.status == 200 else {}
+
+    def table(self, sim_state, sort_by=()):
+        self.call("table", [
+            _p("raw-table", "page_current", 0), _p("raw-table", "page_size", 12),
+            _p("raw-table", "sort_by", list(sort_by)), _p("raw-table", "filter_query", ""),
+            _p("sim-state", "data", sim_state),
+        ], changed="raw-table.sort_by" if sort_by else "sim-state.data")
+
+    def views(self, sim_state, version, metric: str):
+        """The server side of a data change: the view cube, or (--server-views) the chart callbacks.
+        Returns the view cube version the browser now holds."""
+        if not self.server_views:
+            resp = self.call("view_cube", [_p("sim-state", "data", sim_state)], [_p("view-cube-version", "data", version)])
+            return resp.get("view-cube-version", {}).get("data", version)
+        charts = _p("data-and-charts", "children")
+        self.call("kpis", [_p("sim-state", "data", sim_state), _p("kpi-scope", "value", "lm"),
+                           _p("pie-month", "value", self.month), charts], changed="kpi-scope.value")
+        self.call("pie", [_p("sim-state", "data", sim_state), _p("pie-month", "value", self.month),
+                          _p("pie-metric", "value", metric), charts], changed="pie-metric.value")
+        self.call("compact", [_p("sim-state", "data", sim_state), _p("compact-metrics", "value", ["qty", "revenue"]),
+                              _p("mom-range", "value", 40), _p("compact-item", "value", "ALL"), charts],
+                  changed="compact-metrics.value")
+        return version
+
+    def run(self, think: float) -> list:
+        resp = self.call("start", [_p("start-btn", "n_clicks", 1)],
+                         [_p("student-id", "value", f"student-{self.index:04d}"), _p("section-code", "value", "")])
+        ref = resp["data-store"]["data"]
+        resp = self.call("init", [_p("data-store", "data", ref)])
+        sim_state, icontrol = resp["sim-state"]["data"], resp["instructor-control"]["data"]
+        self.call("render", [_p("data-store", "data", ref)])
+        version = self.views(sim_state, None, "Sales Quantity")
+        self.table(sim_state)
+        for n, week in enumerate(int(w) for w in WEEKS):
+            time.sleep(think)
+            self.call("poll", [_p("sim-state", "data", sim_state), _p("instructor-control", "data", icontrol),
+                               _p("unlock-version", "data", 1)], changed="unlock-version.data",
+                      outputs=[{"id": _week_id(w), "property": "disabled"} for w in range(2, 8)])
+            clicks = [_p(_week_id(w), "n_clicks", 1 if w == week else None) for w in range(2, 8)]
+            resp = self.call("open", [clicks], [_p("instructor-control", "data", icontrol),
+                                                _p("sim-state", "data", sim_state)],
+                             changed=_week_prop(week, "n_clicks"))
+            active = resp["active-event"]["data"]
+            choice = "ABC"[(self.index + n) % 3]
+            resp = self.call("confirm", [_p("confirm-choice", "n_clicks", n + 1)], [
+                _p("event-choice", "value", choice), _p("active-event", "data", active), _p("sim-state", "data", sim_state),
+            ])
+            sim_state = resp["sim-state"]["data"]
+            version = self.views(sim_state, version, ["Sales Quantity", "Sales Revenue"][n % 2])
+            self.table(sim_state, [{"column_id": "Profit", "direction": "desc" if n % 2 else "asc"}])
+        self.conn.close()
+        return self.timings
+
+
+def _student(args) -> list:
+    port, keys, index, server_views, think = args
+    return Student(port, keys, index, server_views).run(think)
+
+
+def _keys(port: int, server_views: bool) -> dict:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request("GET", "/_dash-dependencies")
+    deps = json.loads(conn.getresponse().read())
+    keys = {
+        "start": _output_key(deps, "data-store.data", "post-start-msg"),
+        "init": _output_key(deps, "sim-state.data", "instructor-control.data", ".."),
+        "render": _output_key(deps, "data-and-charts.children"),
+        "table": _output_key(deps, "raw-table.data"),
+        "poll": _output_key(deps, '"week-btn"', ".disabled"),
+        "open": _output_key(deps, "active-event.data"),
+        "confirm": _output_key(deps, "student-feedback.children"),
+    }
+    if server_views:
+        keys.update(kpis=_output_key(deps, "kpi-cards.children"), pie=_output_key(deps, "pie-graph.figure"),
+                    compact=_output_key(deps, "compact-graph.figure"))
+    else:
+        keys["view_cube"] = _output_key(deps, "view-cube.data")
+    return keys
+
+
+def run(workers: int, threads: int, students: int, concurrency: int, server_views: bool, think: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        control_db = os.path.join(tmp, "control.db")
+        UnlockStore(control_db).set_unlocked({w: True for w in WEEKS})
+        env = {"CONTROL_DB": control_db, "SESSION_BACKEND": "sqlite", "SESSION_DB": os.path.join(tmp, "sessions.db"),
+               "CLIENTSIDE_VIEWS": "0" if server_views else "1"}
+        proc, port = start_server(workers, threads, env)
+        try:
+            keys = _keys(port, server_views)
+            t0 = time.perf_counter()
+            with mp.Pool(concurrency) as pool:
+                results = pool.map(_student, [(port, keys, i, server_views, think) for i in range(students)], chunksize=1)
+            wall = time.perf_counter() - t0
+        finally:
+            stop_server(proc)
+    by_step = defaultdict(list)
+    for timings in results:
+        for step, seconds in timings:
+            by_step[step].append(seconds * 1000.0)
+    lat = np.concatenate([np.asarray(v) for v in by_step.values()])
+    summary = {step: np.percentile(v, [50, 95, 99]) for step, v in by_step.items()}
+    return {"config": f"{workers}x{threads or 'gevent'}", "requests": int(lat.size), "req_per_s": lat.size / wall,
+            "p": np.percentile(lat, [50, 95, 99]), "steps": summary, "wall_s": wall}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", nargs="+", default=["4xgevent", "1x8", "4x2"],
+                        help="gunicorn WORKERSxgevent (gevent, 1000 connections each, as deployed) or "
+                             "WORKERSxTHREADS (gthread) to compare")
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=None, help="students in flight (default: all)")
+    parser.add_argument("--think", type=float, default=0.0, help="seconds between weeks per student")
+    parser.add_argument("--server-views", action="store_true", help="run with CLIENTSIDE_VIEWS=0")
+    parser.add_argument("--steps", action="store_true", help="also print per-step percentiles")
+    args = parser.parse_args(argv)
+    concurrency = args.concurrency or args.students
+    print(f"{'config':>9} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for config in args.configs:
+        workers, threads = parse_config(config)
+        r = run(workers, threads, args.students, concurrency, args.server_views, args.think)
+        print(f"{r['config']:>9} {r['requests']:>9} {r['req_per_s']:>9.1f} " + " ".join(f"{v:>8.2f}" for v in r["p"]))
+        if args.steps:
+            for step, p in r["steps"].items():
+                print(f"{'':>9} {step:>9} " + " ".join(f"{v:>8.2f}" for v in p))
+
+
+if __name__ == "__main__":
+    main()
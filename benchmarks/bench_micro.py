@@ -0,0 +1,105 @@
+"""Micro-benchmarks for the pure functions in data_generation, events_engine and components.
+
+Every case runs at the default 12 months x 7 items and at a scaled 36 months x 1,000 items.
+Timings are per call (best and median of ``--repeat`` rounds, timeit autoranged).
+
+    python benchmarks/bench_micro.py                  # print timings
+    python benchmarks/bench_micro.py --compare        # ... next to benchmarks/baseline_micro.json
+    python benchmarks/bench_micro.py --save           # refresh the stored baseline
+    python benchmarks/bench_micro.py -k w3_ --sizes default
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from components import compact_amounts_and_changes, raw_data_table, single_pie  # noqa: E402
+from data_generation import generate_data  # noqa: E402
+from events_engine import FUNCTIONS, _apply_on_latest, _delta_summary, _latest_month  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_micro.json")
+SIZES = {
+    "default": {},
+    "scaled": {"n_items": 1000, "n_months": 36, "compat": False},
+}
+
+
+def cases(size: str):
+    """(name, zero-argument callable) pairs for one size."""
+    params = SIZES[size]
+    df = generate_data(42, end_month="2025-06", **params)
+    mask = (df["Category"] == "Tops").to_numpy()
+    after = _apply_on_latest(df, mask, qty_mult=0.9, price_mult=1.05, inv_delta_pct=-0.1)
+    month = _latest_month(df)
+    out = [
+        ("generate_data", lambda: generate_data(42, end_month="2025-06", **params)),
+        ("_apply_on_latest", lambda: _apply_on_latest(df, mask, qty_mult=0.9, price_mult=1.05, inv_delta_pct=-0.1)),
+        ("_delta_summary", lambda: _delta_summary(df, after)),
+    ]
+    out += [(name, (lambda fn: lambda: fn(df))(fn)) for name, fn in FUNCTIONS.items()]
+    out += [
+        ("single_pie", lambda: single_pie(df, month, "Sales Revenue")),
+        ("compact_amounts_and_changes", lambda: compact_amounts_and_changes(df)),
+        ("raw_data_table", lambda: raw_data_table(df)),
+        ("raw_data_table[server_side]", lambda: raw_data_table(df, server_side=True)),
+    ]
+    return [(f"{name}[{size}]", fn) for name, fn in out]
+
+
+def measure(fn, repeat: int) -> dict:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    per_call = [t / number * 1000.0 for t in timer.repeat(repeat, number)]
+    return {"min_ms": min(per_call), "median_ms": statistics.median(per_call), "number": number}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("-k", dest="pattern", default="", help="only cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", action="store_true", help=f"write results to {os.path.relpath(BASELINE, ROOT)}")
+    parser.add_argument("--compare", action="store_true", help="show the ratio to the stored baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="flag cases slower than baseline by this ratio")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(BASELINE) as fh:
+            baseline = json.load(fh)["results"]
+    results = {}
+    print(f"{'case':<48} {'best ms':>10} {'median ms':>10}" + (f" {'vs base':>8}" if baseline else ""))
+    for size in args.sizes:
+        for name, fn in cases(size):
+            if args.pattern not in name:
+                continue
+            r = results[name] = measure(fn, args.repeat)
+            line = f"{name:<48} {r['min_ms']:>10.3f} {r['median_ms']:>10.3f}"
+            if name in baseline:
+                ratio = r["min_ms"] / baseline[name]["min_ms"]
+                line += f" {ratio:>7.2f}x" + ("  <-- slower" if ratio > args.threshold else "")
+            print(line)
+    if args.save:
+        stored = {}
+        if os.path.exists(BASELINE):
+            with open(BASELINE) as fh:
+                stored = json.load(fh)["results"]
+        stored.update(results)
+        meta = {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+                "machine": platform.machine(), "processor": platform.processor() or platform.machine()}
+        with open(BASELINE, "w") as fh:
+            json.dump({"meta": meta, "results": dict(sorted(stored.items()))}, fh, indent=1)
+            fh.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Throughput of the unlock callback (``control_week_buttons``) under gunicorn.
+
+Starts ``app:server`` with 1, 4 and 8 workers sharing one UnlockStore file and hammers
+``/_dash-update-component`` with the request a browser sends when its unlock version changes.
+Workers are gevent with 1000 connections each, as render.yaml deploys; ``--threads N`` runs
+gthread workers instead.
+
+    python benchmarks/bench_unlock.py --workers 1 4 8 --clients 32 --duration 10
+    python benchmarks/bench_unlock.py --workers 4 --threads 8
+"""
+import argparse
+import http.client
+import json
+import multiprocessing as mp
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+START_PAYLOAD = {
+    "output": "..data-store.data...post-start-msg.children..",
+    "outputs": [{"id": "data-store", "property": "data"}, {"id": "post-start-msg", "property": "children"}],
+    "inputs": [{"id": "start-btn", "property": "n_clicks", "value": 1}],
+    "state": [{"id": "student-id", "property": "value", "value": "bench"},
+              {"id": "section-code", "property": "value", "value": ""}],
+    "changedPropIds": ["start-btn.n_clicks"],
+}
+
+
+def poll_payload(sim_state: dict) -> dict:
+    return {
+        "output": '{"type":"week-btn","week":["ALL"]}.disabled',
+        "outputs": [{"id": {"type": "week-btn", "week": w}, "property": "disabled"} for w in range(2, 8)],
+        "inputs": [
+            {"id": "sim-state", "property": "data", "value": sim_state},
+            {"id": "instructor-control", "property": "data", "value": {"role": "student"}},
+            {"id": "unlock-version", "property": "data", "value": 1},
+        ],
+        "changedPropIds": ["unlock-version.data"],
+        "state": [],
+    }
+
+
+def start_session(port: int) -> dict:
+    """sim-state of a fresh session (the poll reads its record)."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    conn.request("POST", "/_dash-update-component", json.dumps(START_PAYLOAD), {"Content-Type": "application/json"})
+    ref = json.loads(conn.getresponse().read())["response"]["data-store"]["data"]
+    conn.close()
+    return {**ref, "week": 1, "rev": 0, "completed_weeks": []}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def parse_config(config: str) -> tuple:
+    """"4xgevent" -> (4, 0), gevent workers; "4x8" -> (4, 8), gthread workers with 8 threads."""
+    workers, kind = config.lower().split("x")
+    return int(workers), 0 if kind == "gevent" else int(kind)
+
+
+def start_server(workers: int, threads: int, env: dict, connections: int = 1000) -> tuple:
+    """gunicorn on a free port: gevent workers with ``connections`` each (as render.yaml deploys)
+    when ``threads`` is 0, else gthread workers."""
+    port = free_port()
+    worker_class = (["-k", "gthread", "--threads", str(threads)] if threads
+                    else ["-k", "gevent", "--worker-connections", str(connections)])
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--workers", str(workers), *worker_class,
+         "-b", f"127.0.0.1:{port}", "app:server"],
+        cwd=ROOT, env={**os.environ, **env}, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/_dash-layout")
+            if conn.getresponse().status == 200:
+                return proc, port
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("gunicorn did not come up")
+
+
+def stop_server(proc) -> None:
+    proc.terminate()
+    try:
+        proc.wait(10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def _client(args) -> list:
+    port, payload, duration = args
+    body = json.dumps(payload)
+    headers = {"Content-Type": "application/json"}
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    latencies = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        t0 = time.perf_counter()
+        conn.request("POST", "/_dash-update-component", body, headers)
+        resp = conn.getresponse()
+        resp.read()
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status}")
+        latencies.append(time.perf_counter() - t0)
+    conn.close()
+    return latencies
+
+
+def run(workers: int, threads: int, clients: int, duration: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {"CONTROL_DB": os.path.join(tmp, "control.db"), "SESSION_BACKEND": "sqlite",
+               "SESSION_DB": os.path.join(tmp, "sessions.db")}
+        proc, port = start_server(workers, threads, env)
+        try:
+            payload = poll_payload(start_session(port))
+            with mp.Pool(clients) as pool:
+                results = pool.map(_client, [(port, payload, duration)] * clients)
+        finally:
+            stop_server(proc)
+    lat = np.concatenate([np.asarray(r) for r in results]) * 1000.0
+    return {
+        "workers": workers,
+        "requests": int(lat.size),
+        "req_per_s": lat.size / duration,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p95_ms": float(np.percentile(lat, 95)),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--threads", type=int, default=0, help="gthread workers with this many threads (default: gevent)")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args(argv)
+    print(f"{'workers':>7} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for w in args.workers:
+        r = run(w, args.threads, args.clients, args.duration)
+        print(f"{r['workers']:>7} {r['requests']:>9} {r['req_per_s']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
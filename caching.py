@@ -0,0 +1,86 @@
+# caching.py — small thread-safe LRU used for figures and other derived, immutable values
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+import pandas as pd
+
+
+class LRUCache:
+    """Least-recently-used mapping bounded by entry count, or by total ``sizeof(value)`` (e.g.
+    bytes) when ``sizeof`` is given. The newest entry is always kept."""
+
+    def __init__(self, maxsize: int = 512, sizeof: Callable[[Any], int] = None):
+        self.maxsize = maxsize
+        self.sizeof = sizeof
+        self.currsize = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: "dict[Hashable, int]" = {}
+        self._lock = threading.Lock()
+        self._building: "dict[Hashable, threading.Lock]" = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        size = self.sizeof(value) if self.sizeof else 1
+        with self._lock:
+            self.currsize += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while self.currsize > self.maxsize and len(self._data) > 1:
+                old, _ = self._data.popitem(last=False)
+                self.currsize -= self._sizes.pop(old)
+        return value
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Cached value for ``key``; on a miss ``build()`` runs outside the cache lock, once per key
+        even when several threads miss together (the others wait for its result)."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value
+        with self._lock:
+            key_lock = self._building.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                with self._lock:
+                    value = self._data.get(key, sentinel)
+                if value is sentinel:
+                    value = self.put(key, build())
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.currsize = 0
+
+
+def frame_version(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame (values, columns and index), for cache keys."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    h.update("\x1f".join(map(str, df.columns)).encode())
+    return h.hexdigest()
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    """Memory held by a DataFrame, as an ``LRUCache`` ``sizeof``."""
+    return int(df.memory_usage(index=True, deep=True).sum())
@@ -0,0 +1,139 @@
+# class_stats.py — class-wide decision statistics for the instructor dashboard
+#
+# Each confirmed decision updates its section's running counters in a small SQLite file shared by
+# every worker: choice counts per week; count, sum, sum of squares and a sparse fixed-width histogram of the
+# decision's Profit % per week; and the most extreme results per week. Reading the dashboard
+# touches only those tables, never the sessions, so its cost doesn't grow with the class.
+import math
+import os
+from typing import Any, Dict, List, Sequence
+
+from dbconn import pool
+
+PERCENTILES = [10, 25, 50, 75, 90]
+
+
+class ClassStats:
+    """Incremental per-week aggregates of one section's decisions, keyed by session id so a
+    decision counts once.
+
+    ``bucket_width`` (percentage points) bounds the percentile error; ``keep`` is how many of the
+    lowest and highest results per week are kept as outlier candidates.
+    """
+
+    def __init__(self, path: str, section: str = "default", bucket_width: float = 0.25, keep: int = 10):
+        self.path = path
+        self.section = section
+        self.bucket_width = bucket_width
+        self.keep = keep
+        self._db = pool(path).connection
+        with self._db() as conn:
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS stats_version (section TEXT PRIMARY KEY, version INTEGER NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS stats_seen ("
+                " section TEXT NOT NULL, sid TEXT NOT NULL, week INTEGER NOT NULL, PRIMARY KEY (section, sid, week));"
+                "CREATE TABLE IF NOT EXISTS stats_choices ("
+                " section TEXT NOT NULL, week INTEGER NOT NULL, choice TEXT NOT NULL, n INTEGER NOT NULL,"
+                " PRIMARY KEY (section, week, choice));"
+                "CREATE TABLE IF NOT EXISTS stats_moments ("
+                " section TEXT NOT NULL, week INTEGER NOT NULL, n INTEGER NOT NULL, total REAL NOT NULL,"
+                " total_sq REAL NOT NULL, lo REAL NOT NULL, hi REAL NOT NULL, PRIMARY KEY (section, week));"
+                "CREATE TABLE IF NOT EXISTS stats_hist ("
+                " section TEXT NOT NULL, week INTEGER NOT NULL, bucket INTEGER NOT NULL, n INTEGER NOT NULL,"
+                " PRIMARY KEY (section, week, bucket));"
+                "CREATE TABLE IF NOT EXISTS stats_extremes ("
+                " section TEXT NOT NULL, week INTEGER NOT NULL, side TEXT NOT NULL, student TEXT NOT NULL,"
+                " value REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS stats_extremes_rank ON stats_extremes (section, week, side, value);"
+            )
+            conn.execute("INSERT OR IGNORE INTO stats_version (section, version) VALUES (?, 0)", (section,))
+
+    @classmethod
+    def from_env(cls, section: str = "default") -> "ClassStats":
+        return cls(os.environ.get("CLASS_STATS_DB") or os.environ.get("CONTROL_DB", "control.db"), section)
+
+    def version(self) -> int:
+        with self._db() as conn:
+            return conn.execute("SELECT version FROM stats_version WHERE section = ?", (self.section,)).fetchone()[0]
+
+    def record(self, sid: str, week: int, choice: str, profit_pct: float, student: str = None) -> bool:
+        """Add one decision; returns False if this session's week was already counted."""
+        value = float(profit_pct)
+        student = student or sid[:8]
+        key = self.section
+        with self._db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("INSERT OR IGNORE INTO stats_seen (section, sid, week) VALUES (?, ?, ?)",
+                            (key, sid, week)).rowcount == 0:
+                return False
+            conn.execute(
+                "INSERT INTO stats_choices (section, week, choice, n) VALUES (?, ?, ?, 1)"
+                " ON CONFLICT (section, week, choice) DO UPDATE SET n = n + 1", (key, week, choice))
+            conn.execute(
+                "INSERT INTO stats_moments (section, week, n, total, total_sq, lo, hi) VALUES (?, ?, 1, ?, ?, ?, ?)"
+                " ON CONFLICT (section, week) DO UPDATE SET n = n + 1, total = total + excluded.total,"
+                " total_sq = total_sq + excluded.total_sq, lo = min(lo, excluded.lo), hi = max(hi, excluded.hi)",
+                (key, week, value, value * value, value, value))
+            conn.execute(
+                "INSERT INTO stats_hist (section, week, bucket, n) VALUES (?, ?, ?, 1)"
+                " ON CONFLICT (section, week, bucket) DO UPDATE SET n = n + 1",
+                (key, week, math.floor(value / self.bucket_width)))
+            for side, order in (("low", "ASC"), ("high", "DESC")):
+                conn.execute("INSERT INTO stats_extremes (section, week, side, student, value) VALUES (?, ?, ?, ?, ?)",
+                             (key, week, side, student, value))
+                conn.execute(
+                    "DELETE FROM stats_extremes WHERE section = ? AND week = ? AND side = ? AND rowid NOT IN ("
+                    " SELECT rowid FROM stats_extremes WHERE section = ? AND week = ? AND side = ?"
+                    f" ORDER BY value {order} LIMIT ?)",
+                    (key, week, side, key, week, side, self.keep))
+            conn.execute("UPDATE stats_version SET version = version + 1 WHERE section = ?", (key,))
+        return True
+
+    def _percentiles(self, buckets: Sequence, n: int, lo: float, hi: float) -> Dict[int, float]:
+        """Percentiles from the histogram: midpoint of the bucket holding each rank, clamped to the
+        observed range."""
+        out, seen, i = {}, 0, 0
+        for p in PERCENTILES:
+            rank = max(1, math.ceil(p / 100.0 * n))
+            while seen + buckets[i][1] < rank:
+                seen += buckets[i][1]
+                i += 1
+            mid = (buckets[i][0] + 0.5) * self.bucket_width
+            out[p] = round(min(max(mid, lo), hi), 2)
+        return out
+
+    def summary(self) -> Dict[str, Any]:
+        """``{"version", "weeks": {week: {"n", "mean", "std", "lo", "hi", "percentiles", "choices",
+        "outliers"}}}``; outliers are kept extremes beyond 1.5 IQR from the quartiles."""
+        with self._db() as conn:
+            version = conn.execute("SELECT version FROM stats_version WHERE section = ?", (self.section,)).fetchone()[0]
+            moments = conn.execute("SELECT week, n, total, total_sq, lo, hi FROM stats_moments WHERE section = ?"
+                                   " ORDER BY week", (self.section,)).fetchall()
+            buckets = conn.execute("SELECT week, bucket, n FROM stats_hist WHERE section = ? ORDER BY week, bucket",
+                                   (self.section,)).fetchall()
+            choices = conn.execute("SELECT week, choice, n FROM stats_choices WHERE section = ? ORDER BY week, choice",
+                                   (self.section,)).fetchall()
+            extremes = conn.execute("SELECT DISTINCT week, student, value FROM stats_extremes WHERE section = ?"
+                                    " ORDER BY week, value", (self.section,)).fetchall()
+        weeks: Dict[int, Dict[str, Any]] = {}
+        for week, n, total, total_sq, lo, hi in moments:
+            mean = total / n
+            weeks[week] = {"n": n, "mean": round(mean, 2), "std": round(math.sqrt(max(total_sq / n - mean * mean, 0.0)), 2),
+                           "lo": round(lo, 2), "hi": round(hi, 2), "choices": {}, "outliers": []}
+        hist: Dict[int, List] = {}
+        for week, bucket, n in buckets:
+            hist.setdefault(week, []).append((bucket, n))
+        for week, choice, n in choices:
+            if week in weeks:
+                weeks[week]["choices"][choice] = n
+        for week, stats in weeks.items():
+            stats["percentiles"] = self._percentiles(hist[week], stats["n"], stats["lo"], stats["hi"])
+        for week, student, value in extremes:
+            stats = weeks.get(week)
+            if stats is None:
+                continue
+            q1, q3 = stats["percentiles"][25], stats["percentiles"][75]
+            fence = 1.5 * max(q3 - q1, self.bucket_width)
+            if value < q1 - fence or value > q3 + fence:
+                stats["outliers"].append({"student": student, "value": round(value, 2)})
+        return {"version": version, "weeks": weeks}
@@ -0,0 +1,103 @@
+# cohort.py — per-student base datasets for a class, generated in one batch and memory-mapped
+#
+#   python cohort.py roster.txt --out cohort/ --seed 2025
+#
+# roster.txt holds one student id per line. Every worker maps the same files read-only, so the
+# OS page cache holds one copy of the class's data however many workers serve it.
+import argparse
+import json
+import os
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+from data_generation import COLUMNS, NUMERIC, generate_cohort, student_seed
+
+META = "meta.json"
+INTS = ["Sales Quantity", "Inventory Quantity"]
+FLOATS = [c for c in NUMERIC if c not in INTS]
+
+
+class CohortStore:
+    """Read-only view of a built cohort directory (``meta.json`` plus ``ints.npy``/``floats.npy``
+    laid out student × column × row)."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, META)) as fh:
+            meta = json.load(fh)
+        self.path = path
+        self.meta = meta
+        self.students: Dict[str, int] = {sid: i for i, sid in enumerate(meta["students"])}
+        self._ints = np.load(os.path.join(path, "ints.npy"), mmap_mode="r")
+        self._floats = np.load(os.path.join(path, "floats.npy"), mmap_mode="r")
+        self._labels = {k: np.asarray(v, dtype=object if k != "Store" else np.int64)
+                        for k, v in meta["labels"].items()}
+
+    @classmethod
+    def from_env(cls) -> "CohortStore":
+        path = os.environ.get("COHORT_DIR")
+        return cls(path) if path and os.path.exists(os.path.join(path, META)) else None
+
+    @classmethod
+    def build(cls, path: str, student_ids: Iterable[str], cohort_seed: int = 42, **params) -> "CohortStore":
+        """Generate every student's base data (``generate_data(student_seed(id, cohort_seed))``)
+        in one batch and write it under ``path``. ``params`` are generate_data's scale options."""
+        students = list(dict.fromkeys(str(s) for s in student_ids))
+        seeds = [student_seed(s, cohort_seed) for s in students]
+        labels, numeric = generate_cohort(seeds, **params)
+        os.makedirs(path, exist_ok=True)
+        for name, cols, dtype in (("ints", INTS, np.int64), ("floats", FLOATS, np.float64)):
+            tmp = os.path.join(path, f"{name}.{os.getpid()}.tmp.npy")
+            np.save(tmp, np.stack([numeric[c] for c in cols], axis=1).astype(dtype, copy=False))
+            os.replace(tmp, os.path.join(path, f"{name}.npy"))
+        meta = {
+            "students": students,
+            "seeds": seeds,
+            "cohort_seed": cohort_seed,
+            "params": params,
+            "labels": {k: np.asarray(v).tolist() for k, v in labels.items()},
+        }
+        tmp = os.path.join(path, f"{META}.{os.getpid()}.tmp")
+        with open(tmp, "w") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, os.path.join(path, META))  # written last: readers see a complete cohort
+        return cls(path)
+
+    def __len__(self) -> int:
+        return len(self.students)
+
+    def __contains__(self, student_id: str) -> bool:
+        return student_id in self.students
+
+    def seed(self, student_id: str) -> int:
+        return self.meta["seeds"][self.students[student_id]]
+
+    def frame(self, student_id: str) -> pd.DataFrame:
+        """The student's base data. Numeric columns are read-only views of the mapped files;
+        transforms copy before writing."""
+        i = self.students[student_id]
+        numeric = {c: self._ints[i, j] for j, c in enumerate(INTS)}
+        numeric.update({c: self._floats[i, j] for j, c in enumerate(FLOATS)})
+        columns = [c for c in COLUMNS if c != "Store" or self.meta["params"].get("n_stores", 1) > 1]
+        return pd.DataFrame({**self._labels, **numeric}, columns=columns, copy=False)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Build per-student base datasets for a class.")
+    parser.add_argument("roster", help="file with one student id per line")
+    parser.add_argument("--out", default="cohort", help="output directory (COHORT_DIR for the app)")
+    parser.add_argument("--seed", type=int, default=42, help="cohort seed mixed into every student seed")
+    parser.add_argument("--end-month", default=None, help="last month label, YYYY-MM (default: this month)")
+    args = parser.parse_args(argv)
+    with open(args.roster) as fh:
+        students = [line.strip() for line in fh if line.strip()]
+    try:
+        store = CohortStore.build(args.out, students, args.seed, end_month=args.end_month)
+    except ValueError as exc:
+        parser.error(str(exc))
+    print(f"{len(store)} students -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
  
+import os
+
 from dash import html, dcc 
 from dash import dash_table 
 import pandas as pd 
@@ -7,6 +9,12 @@ import plotly.express as px
 import plotly.graph_objects as go 
 from plotly.subplots import make_subplots 
 
+from caching import LRUCache
+
+# Serialized figures keyed by (data version, view parameters); students flipping between the same
+# months and toggles on the same data share entries.
+FIGURES = LRUCache(int(os.environ.get("FIGURE_CACHE_SIZE", "512")))
+
 def opening_message(): 
     return html.Div([
         html.H4("Welcome to the Discount4U Simulation", className="section-title"),
@@ -54,7 +62,8 @@ def _format_currency(x):
 def _format_number(x): 
     return f"{x:,.0f}"
 
-def kpi_cards(revenue_total, profit_total, gm_pct, avg_inv, marketing_total): 
+def kpi_cards(revenue_total, profit_total, gm_pct, avg_inv, marketing_total, value_ids=None): 
+    """``value_ids`` gives each value Div an id, so a clientside callback can update the text."""
     cards = [
         ("Revenue", _format_currency(revenue_total)),
         ("Profit", _format_currency(profit_total)),
@@ -65,24 +74,36 @@ def kpi_cards(revenue_total, profit_total, gm_pct, avg_inv, marketing_total):
     return html.Div([
         html.Div([
             html.Div(title, className="kpi-title"),
-            html.Div(value, className="kpi-value"),
-        ], className="kpi-card") for title, value in cards
+            html.Div(value, className="kpi-value", **({"id": value_ids[i]} if value_ids else {})),
+        ], className="kpi-card") for i, (title, value) in enumerate(cards)
     ], className="kpi-grid")
 
-def raw_data_table(df: pd.DataFrame): 
+def raw_data_title(df: pd.DataFrame) -> str:
+    """"Raw Data (12 months × 7 items)", with "× N stores" for multi-store frames."""
+    shape = [f"{df['Month'].nunique()} months", f"{df['Item'].nunique()} items"]
+    if "Store" in df.columns:
+        shape.append(f"{df['Store'].nunique()} stores")
+    return f"Raw Data ({' × '.join(shape)})"
+
+def raw_data_table(df: pd.DataFrame, server_side: bool = False): 
+    """``server_side`` ships no rows: paging, sorting and filtering become custom actions answered
+    by a callback (see table_query.py), so the response size no longer grows with the table."""
     cols = [
         {"name": c, "id": c} for c in [
-            "Month", "Item", "Category", "Sales Quantity", "Sales Revenue",
+            "Month", "Store", "Item", "Category", "Sales Quantity", "Sales Revenue",
             "COGS", "Profit", "Inventory Quantity", "Marketing Dollars"
         ] if c in df.columns
     ]
     return dash_table.DataTable(
         id="raw-table",
-        data=df.to_dict("records"),
+        data=[] if server_side else df.to_dict("records"),
         columns=cols,
         page_size=12,
-        sort_action="native",
-        filter_action="native",
+        page_current=0,
+        page_action="custom" if server_side else "native",
+        sort_action="custom" if server_side else "native",
+        filter_action="custom" if server_side else "native",
+        filter_query="",
         style_table={"overflowX": "auto"},
         style_cell={"padding": "8px", "whiteSpace": "normal", "height": "auto", "fontSize": 14},
         style_header={"backgroundColor": "#f1f5f9", "fontWeight": "600", "border": "none"},
@@ -106,12 +127,18 @@ def single_pie(df: pd.DataFrame, month: str, metric: str):
 def compact_amounts_and_changes(df: pd.DataFrame, metrics_on=None, mom_range: int = 60, label: str = "All Items (Total)"):
     if metrics_on is None:
         metrics_on = ["qty", "revenue", "profit", "inventory"]
-    monthly = df.groupby("Month", as_index=False).agg({
-        "Sales Quantity": "sum",
-        "Sales Revenue": "sum",
-        "Profit": "sum",
-        "Inventory Quantity": "mean",
-    })
+    if "Rows" in df.columns:  # pre-aggregated cube rows (aggregates.cube_frame)
+        monthly = df.groupby("Month", as_index=False)[
+            ["Sales Quantity", "Sales Revenue", "Profit", "Inventory Quantity", "Rows"]
+        ].sum()
+        monthly["Inventory Quantity"] = monthly["Inventory Quantity"] / monthly["Rows"]
+    else:
+        monthly = df.groupby("Month", as_index=False).agg({
+            "Sales Quantity": "sum",
+            "Sales Revenue": "sum",
+            "Profit": "sum",
+            "Inventory Quantity": "mean",
+        })
     monthly["Month_dt"] = pd.to_datetime(monthly["Month"], format="%Y-%m")
     monthly = monthly.sort_values("Month_dt")
     monthly["Revenue MoM %"] = monthly["Sales Revenue"].pct_change() * 100.0
@@ -178,3 +205,57 @@ def compact_amounts_and_changes(df: pd.DataFrame, metrics_on=None, mom_range: in
         hovermode="x unified",
     )
     return fig
+
+def cached_single_pie(version: str, df: pd.DataFrame, month: str, metric: str):
+    return FIGURES.get_or_build(("pie", version, month, metric), lambda: single_pie(df, month, metric).to_dict())
+
+def cached_compact(version: str, df: pd.DataFrame, metrics_on=None, mom_range: int = 60, item_scope: str = "ALL"):
+    item_scope = item_scope or "ALL"
+    key = ("compact", version, item_scope, None if metrics_on is None else tuple(sorted(metrics_on)), mom_range)
+
+    def build():
+        if item_scope == "ALL":
+            return compact_amounts_and_changes(df, metrics_on=metrics_on, mom_range=mom_range).to_dict()
+        dff = df[df["Item"] == item_scope]
+        return compact_amounts_and_changes(dff, metrics_on=metrics_on, mom_range=mom_range, label=item_scope).to_dict()
+    return FIGURES.get_or_build(key, build)
+
+def class_dashboard(summary, events):
+    """Instructor view of ``ClassStats.summary()``: choice shares per week, Profit % percentiles
+    and outliers."""
+    weeks = summary["weeks"]
+    if not weeks:
+        return html.P("No decisions recorded yet.", className="highlight-text")
+    labels = [f"Week {w}" for w in weeks]
+    choices = sorted({c for stats in weeks.values() for c in stats["choices"]})
+    fig = go.Figure([
+        go.Bar(
+            x=labels,
+            y=[stats["choices"].get(c, 0) / stats["n"] * 100.0 for stats in weeks.values()],
+            customdata=[stats["choices"].get(c, 0) for stats in weeks.values()],
+            hovertemplate="%{customdata} students (%{y:.0f}%)<extra>" + c + "</extra>",
+            name=f"Choice {c}",
+        ) for c in choices
+    ])
+    fig.update_layout(barmode="stack", yaxis_title="% of decisions", margin=dict(l=10, r=10, t=30, b=0),
+                      legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    rows = []
+    for w, stats in weeks.items():
+        outliers = ", ".join(f"{o['student']} ({o['value']:+.1f}%)" for o in stats["outliers"])
+        rows.append({
+            "Week": w, "Event": events.get(str(w), {}).get("title", ""), "Decisions": stats["n"],
+            "Mean": stats["mean"], **{f"P{p}": v for p, v in stats["percentiles"].items()},
+            "Min": stats["lo"], "Max": stats["hi"], "Outliers": outliers or "—",
+        })
+    return html.Div([
+        dcc.Graph(figure=fig, config={"displayModeBar": False}, style={"height": "320px"}),
+        html.H5("Profit % of each week's decision (latest month)"),
+        dash_table.DataTable(
+            data=rows,
+            columns=[{"name": c, "id": c} for c in rows[0]],
+            style_table={"overflowX": "auto"},
+            style_cell={"padding": "6px", "whiteSpace": "normal", "height": "auto", "fontSize": 13},
+            style_header={"backgroundColor": "#f1f5f9", "fontWeight": "600", "border": "none"},
+            style_data={"border": "none"},
+        ),
+    ])
@@ -0,0 +1,297 @@
+# control_plane.py — instructor unlock state shared by every gunicorn worker
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+from dbconn import pool
+
+WEEKS = [str(w) for w in range(2, 8)]
+
+
+class UnlockStore:
+    """Week-unlock flags in a small SQLite file, so all worker processes see the same state
+    and it survives restarts.
+
+    Every write bumps a monotonically increasing ``version``. Reads first fetch only the version
+    and reuse the last decoded value when it hasn't moved, so the common poll is one indexed
+    integer lookup.
+    """
+
+    def __init__(self, path: str, key: str = "default"):
+        self.path = path
+        self.key = key
+        self._db = pool(path).connection
+        self._cache: Tuple[int, Dict[str, bool]] = (-1, {})
+        self._lock = threading.Lock()
+        with self._db() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS unlocks ("
+                " key TEXT PRIMARY KEY, weeks TEXT NOT NULL, version INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO unlocks (key, weeks, version) VALUES (?, ?, 0)",
+                (key, json.dumps({w: False for w in WEEKS})),
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS unlock_schedule ("
+                " key TEXT NOT NULL, week TEXT NOT NULL, at REAL NOT NULL, fired INTEGER NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (key, week, at))"
+            )
+
+    @classmethod
+    def from_env(cls) -> "UnlockStore":
+        return cls(os.environ.get("CONTROL_DB", "control.db"))
+
+    def version(self) -> int:
+        with self._db() as conn:
+            return conn.execute("SELECT version FROM unlocks WHERE key = ?", (self.key,)).fetchone()[0]
+
+    def read(self) -> Tuple[int, Dict[str, bool]]:
+        """Return ``(version, {week: unlocked})``."""
+        version = self.version()
+        with self._lock:
+            if self._cache[0] == version:
+                return self._cache
+        with self._db() as conn:
+            row = conn.execute("SELECT weeks, version FROM unlocks WHERE key = ?", (self.key,)).fetchone()
+        snapshot = (row[1], json.loads(row[0]))
+        with self._lock:
+            if snapshot[0] > self._cache[0]:
+                self._cache = snapshot
+        return snapshot
+
+    def unlocked(self) -> Dict[str, bool]:
+        return self.read()[1]
+
+    def set_unlocked(self, weeks: Dict[str, bool]) -> int:
+        """Replace the unlock flags; returns the new version (unchanged if nothing changed)."""
+        weeks = {w: bool(weeks.get(w, False)) for w in WEEKS}
+        with self._db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT weeks, version FROM unlocks WHERE key = ?", (self.key,)).fetchone()
+            if json.loads(row[0]) == weeks:
+                return row[1]
+            conn.execute(
+                "UPDATE unlocks SET weeks = ?, version = version + 1 WHERE key = ?",
+                (json.dumps(weeks), self.key),
+            )
+            return row[1] + 1
+
+    def set_schedule(self, times: Dict[str, float]) -> List[Tuple[float, str]]:
+        """Make ``{week: unix time}`` this key's unlock schedule; returns the ``(at, week)`` entries
+        that have not fired yet. Entries that already fired stay fired, so restarting a worker (or
+        starting several) never repeats an unlock the instructor has since taken back."""
+        unknown = set(times) - set(WEEKS)
+        if unknown:
+            raise ValueError(f"Scheduled weeks must be among {WEEKS}, got {sorted(unknown)}")
+        with self._db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute("SELECT week, at FROM unlock_schedule WHERE key = ? AND fired = 0", (self.key,))
+            stale = [(w, at) for w, at in rows if times.get(w) != at]
+            conn.executemany("DELETE FROM unlock_schedule WHERE key = ? AND week = ? AND at = ?",
+                             [(self.key, w, at) for w, at in stale])
+            conn.executemany("INSERT OR IGNORE INTO unlock_schedule (key, week, at) VALUES (?, ?, ?)",
+                             [(self.key, w, float(at)) for w, at in times.items()])
+            pending = conn.execute("SELECT at, week FROM unlock_schedule WHERE key = ? AND fired = 0 ORDER BY at",
+                                   (self.key,)).fetchall()
+        return [(at, week) for at, week in pending]
+
+    def fire(self, week: str, at: float) -> bool:
+        """Unlock ``week`` for the schedule entry ``(week, at)`` unless some worker already fired it;
+        returns whether the unlock flags (and so the version) changed."""
+        with self._db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            claimed = conn.execute(
+                "UPDATE unlock_schedule SET fired = 1 WHERE key = ? AND week = ? AND at = ? AND fired = 0",
+                (self.key, week, at)).rowcount
+            if not claimed:
+                return False
+            row = conn.execute("SELECT weeks FROM unlocks WHERE key = ?", (self.key,)).fetchone()
+            weeks = json.loads(row[0])
+            if weeks.get(week):
+                return False
+            weeks[week] = True
+            conn.execute("UPDATE unlocks SET weeks = ?, version = version + 1 WHERE key = ?",
+                         (json.dumps(weeks), self.key))
+            return True
+
+    def schedule(self) -> List[Tuple[float, str, bool]]:
+        """``(at, week, fired)`` for every schedule entry, soonest first."""
+        with self._db() as conn:
+            rows = conn.execute("SELECT at, week, fired FROM unlock_schedule WHERE key = ? ORDER BY at",
+                                (self.key,)).fetchall()
+        return [(at, week, bool(fired)) for at, week, fired in rows]
+
+
+def parse_time(value) -> float:
+    """Unix time from a number or an ISO 8601 string (without an offset it is server local time)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        raise ValueError(f"Expected a unix time or ISO 8601 timestamp, got {value!r}") from None
+
+
+class VersionWatcher:
+    """Lets many waiters block on "version changed" for one store.
+
+    A single daemon thread per process polls ``store.version()`` every ``interval`` seconds and
+    wakes waiters, so the cost of N connected browsers is one integer read per tick, not N.
+    Writers in this process can call :meth:`notify` to wake waiters immediately.
+    """
+
+    def __init__(self, store: UnlockStore, interval: float = 0.5):
+        self.store = store
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._version = store.version()
+        self._thread = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._cond:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="unlock-watcher", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            self.notify()
+
+    def notify(self) -> int:
+        version = self.store.version()
+        with self._cond:
+            if version != self._version:
+                self._version = version
+                self._cond.notify_all()
+        return version
+
+    def wait(self, since: int, timeout: float) -> int:
+        """Block until the version differs from ``since`` or ``timeout`` elapses; returns the version."""
+        self._ensure_started()
+        with self._cond:
+            self._cond.wait_for(lambda: self._version != since, timeout)
+            return self._version
+
+
+class UnlockScheduler:
+    """One heap of pending scheduled unlocks for every store in the process, served by a single
+    daemon thread that sleeps until the earliest entry is due.
+
+    A tick looks only at the top of the heap, so its cost does not depend on how many students are
+    connected. Firing goes through :meth:`UnlockStore.fire`, which lets exactly one worker apply an
+    entry and bumps the store version, so browsers hear of it through the usual unlock push.
+    """
+
+    def __init__(self, max_sleep: float = 60.0):
+        self.max_sleep = max_sleep  # re-check at least this often (wall-clock adjustments)
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def load(self, store: UnlockStore, times: Dict[str, float], on_fire: Callable[[], object] = None) -> int:
+        """Schedule ``store``'s pending entries after making ``times`` its schedule (see
+        :meth:`UnlockStore.set_schedule`); ``on_fire`` runs after an entry changed the unlocks
+        (e.g. ``VersionWatcher.notify`` to wake this process's waiters at once)."""
+        pending = store.set_schedule(times)
+        with self._cond:
+            for at, week in pending:
+                heapq.heappush(self._heap, (at, next(self._seq), store, week, at, on_fire))  # (due, ..., scheduled at)
+            if pending and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="unlock-scheduler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return len(pending)
+
+    def _next_due(self):
+        """Pop the earliest entry once it is due (blocking until then)."""
+        with self._cond:
+            while True:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                delay = self._heap[0][0] - time.time()
+                if delay <= 0:
+                    return heapq.heappop(self._heap)
+                self._cond.wait(min(delay, self.max_sleep))
+
+    def _run(self) -> None:
+        while True:
+            entry = self._next_due()
+            _, _, store, week, at, on_fire = entry
+            try:
+                changed = store.fire(week, at)
+            except sqlite3.OperationalError:  # database busy: try again shortly
+                with self._cond:
+                    heapq.heappush(self._heap, (time.time() + 5.0,) + entry[1:])
+                continue
+            if changed and on_fire is not None:
+                on_fire()
+
+
+class SectionFull(RuntimeError):
+    """The section already has its maximum number of active sessions."""
+
+
+class SessionLeases:
+    """Cap on concurrent sessions per section, shared by every worker through the control database.
+
+    A holder (a session id, or anything else naming one student's seat) holds a lease from
+    :meth:`acquire` until ``ttl`` seconds after its last renewal.
+    ``limit`` 0 means unlimited and skips the database entirely.
+    """
+
+    def __init__(self, path: str, key: str = "default", limit: int = 0, ttl: float = 3 * 3600.0):
+        self.path = path
+        self.key = key
+        self.limit = limit
+        self.ttl = ttl
+        self._db = pool(path).connection
+        with self._db() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_leases ("
+                " key TEXT NOT NULL, sid TEXT NOT NULL, expires REAL NOT NULL, PRIMARY KEY (key, sid))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS session_leases_expiry ON session_leases (key, expires)")
+
+    def acquire(self, sid: str) -> None:
+        """Take or renew ``sid``'s lease; raises SectionFull when a new lease would exceed the limit."""
+        if not self.limit:
+            return
+        now = time.time()
+        with self._db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            renewed = conn.execute("UPDATE session_leases SET expires = ? WHERE key = ? AND sid = ? AND expires > ?",
+                                   (now + self.ttl, self.key, sid, now))
+            if renewed.rowcount:
+                return
+            conn.execute("DELETE FROM session_leases WHERE key = ? AND expires <= ?", (self.key, now))
+            active = conn.execute("SELECT COUNT(*) FROM session_leases WHERE key = ?", (self.key,)).fetchone()[0]
+            if active >= self.limit:
+                raise SectionFull(f"Section {self.key} already has {active} active sessions (limit {self.limit})")
+            conn.execute("INSERT OR REPLACE INTO session_leases (key, sid, expires) VALUES (?, ?, ?)",
+                         (self.key, sid, now + self.ttl))
+
+    def renew(self, sid: str) -> None:
+        """Extend ``sid``'s lease, re-creating it if it lapsed; never refused (the session exists)."""
+        if self.limit:
+            with self._db() as conn:
+                conn.execute("INSERT OR REPLACE INTO session_leases (key, sid, expires) VALUES (?, ?, ?)",
+                             (self.key, sid, time.time() + self.ttl))
+
+    def active(self) -> int:
+        with self._db() as conn:
+            return conn.execute("SELECT COUNT(*) FROM session_leases WHERE key = ? AND expires > ?",
+                                (self.key, time.time())).fetchone()[0]
@@ -1,48 +1,164 @@
- 
-import pandas as pd 
-import numpy as np 
+import hashlib
 
-def generate_data(seed: int = 42) -> pd.DataFrame:
+import pandas as pd
+import numpy as np
+
+ITEMS = [
+    ("Jeans", "Bottoms", 55.0, 0.55),
+    ("T-Shirts", "Tops", 18.0, 0.45),
+    ("Jackets", "Outerwear", 90.0, 0.60),
+    ("Shoes", "Footwear", 75.0, 0.58),
+    ("Dresses", "Dresses", 70.0, 0.57),
+    ("Accessories", "Accessories", 15.0, 0.40),
+    ("Hoodies", "Tops", 48.0, 0.52),
+]
+
+COLUMNS = [
+    "Month", "Store", "Item", "Category", "Sales Quantity", "Sales Revenue",
+    "COGS", "Profit", "Inventory Quantity", "Marketing Dollars",
+]
+
+def month_anchor(end_month: str = None) -> str:
+    """Last month label ("%Y-%m") of a dataset: ``end_month`` validated, or the current month."""
+    if end_month is None:
+        return pd.Timestamp.today().strftime("%Y-%m")
+    try:
+        return pd.Period(end_month, freq="M").strftime("%Y-%m")
+    except ValueError:
+        raise ValueError(f"end_month must look like YYYY-MM, got {end_month!r}") from None
+
+def _month_labels(n_months: int, end_month: str = None):
+    end = pd.Period(month_anchor(end_month), freq="M")
+    return pd.period_range(end=end, periods=n_months, freq="M").strftime("%Y-%m")
+
+def _catalog(rng, n_items: int):
+    """Item names/categories/prices/cost ratios. The first 7 are the legacy catalog;
+    extra SKUs are priced variants of it (drawn from ``rng``)."""
+    base = len(ITEMS)
+    idx = np.arange(n_items) % base
+    names = np.array([it[0] for it in ITEMS], dtype=object)[idx]
+    cats = np.array([it[1] for it in ITEMS], dtype=object)[idx]
+    price = np.array([it[2] for it in ITEMS])[idx]
+    cost_ratio = np.array([it[3] for it in ITEMS])[idx]
+    if n_items > base:
+        extra = slice(base, None)
+        names[extra] = [f"{n} {i // base + 1:03d}" for n, i in zip(names[extra], range(base, n_items))]
+        price[extra] = np.round(price[extra] * rng.uniform(0.8, 1.2, n_items - base), 2)
+    return names, cats, price, cost_ratio
+
+def _legacy_draws(rng, n_months: int, n_items: int):
+    """Scalar draws in the original per-month/per-item order (bit-for-bit with the old loop)."""
+    pool = np.empty((n_months, 1))
+    alloc = np.empty((n_months, 1, n_items))
+    noise = np.empty((4, n_months, 1, n_items))
+    for m in range(n_months):
+        pool[m, 0] = rng.uniform(800, 1600)
+        alloc[m, 0] = rng.dirichlet(np.ones(n_items))
+        for i in range(n_items):
+            noise[0, m, 0, i] = rng.normal(300, 80)
+            noise[1, m, 0, i] = rng.normal(0, 15)
+            noise[2, m, 0, i] = rng.uniform(0.4, 0.9)
+            noise[3, m, 0, i] = rng.normal(0, 20)
+    return pool, alloc, noise
+
+def _grid_draws(rng, n_months: int, n_stores: int, n_items: int):
+    """Whole (month, store, item) grids in one draw per variable."""
+    shape = (n_months, n_stores, n_items)
+    # Pool is sized for the 7-item legacy catalog; scale it with the SKU count.
+    pool = rng.uniform(800, 1600, (n_months, n_stores)) * (n_items / len(ITEMS))
+    alloc = rng.dirichlet(np.ones(n_items), (n_months, n_stores))
+    noise = np.stack([
+        rng.normal(300, 80, shape),
+        rng.normal(0, 15, shape),
+        rng.uniform(0.4, 0.9, shape),
+        rng.normal(0, 20, shape),
+    ])
+    return pool, alloc, noise
+
+NUMERIC = ["Sales Quantity", "Sales Revenue", "COGS", "Profit", "Inventory Quantity", "Marketing Dollars"]
+
+def student_seed(student_id: str, cohort_seed: int = 42) -> int:
+    """Stable per-student seed (same in every process, unlike ``hash``)."""
+    digest = hashlib.blake2b(f"{cohort_seed}:{student_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") >> 1
+
+def _draws(seed: int, n_items: int, n_stores: int, n_months: int, compat: bool):
+    if n_items < 1 or n_stores < 1 or n_months < 1:
+        raise ValueError("n_items, n_stores and n_months must be >= 1")
+    if compat and (n_stores != 1 or n_items > len(ITEMS)):
+        raise ValueError("compat mode supports a single store and at most 7 items")
+    rng = np.random.default_rng(seed)
+    names, cats, price, cost_ratio = _catalog(rng, n_items)
+    if compat:
+        pool, alloc, noise = _legacy_draws(rng, n_months, n_items)
+    else:
+        pool, alloc, noise = _grid_draws(rng, n_months, n_stores, n_items)
+    return names, cats, price, cost_ratio, pool, alloc, noise
+
+def _figures(price, cost_ratio, pool, alloc, noise) -> dict:
+    """NUMERIC columns as (..., month, store, item) grids. Works element-wise, so the inputs may
+    carry a leading batch axis (``noise`` then has its 4 variables on axis 1)."""
+    base_demand, qty_noise, inv_u, inv_noise = np.moveaxis(noise, -4, 0)
+    n_months = pool.shape[-2]
+    seasonal = np.array([0.9 + 0.2 * np.sin(i / 12 * 2 * np.pi) for i in range(n_months)])
+    mkt = alloc * pool[..., None]
+    promo = 1.0 + (mkt / pool[..., None]) * 0.3
+    qty = np.maximum(0, np.trunc(base_demand * seasonal[:, None, None] * promo + qty_noise)).astype(np.int64)
+    revenue = qty * price
+    cogs = qty * price * cost_ratio
+    profit = revenue - cogs - mkt
+    inv_qty = np.maximum(0, np.trunc(qty * inv_u + inv_noise)).astype(np.int64)
+    return {
+        "Sales Quantity": qty,
+        "Sales Revenue": np.round(revenue, 2),
+        "COGS": np.round(cogs, 2),
+        "Profit": np.round(profit, 2),
+        "Inventory Quantity": inv_qty,
+        "Marketing Dollars": np.round(mkt, 2),
+    }
+
+def _labels(names, cats, n_stores: int, n_months: int, end_month: str = None) -> dict:
+    n_items = len(names)
+    return {
+        "Month": np.repeat(np.asarray(_month_labels(n_months, end_month), dtype=object), n_stores * n_items),
+        "Store": np.tile(np.repeat(np.arange(1, n_stores + 1), n_items), n_months),
+        "Item": np.tile(names, n_months * n_stores),
+        "Category": np.tile(cats, n_months * n_stores),
+    }
+
+def _frame(labels: dict, numeric: dict) -> pd.DataFrame:
+    df = pd.DataFrame({**labels, **numeric}, columns=COLUMNS)
+    if (df["Store"] == 1).all():
+        df = df.drop(columns=["Store"])
+    return df
+
+def generate_data(seed: int = 42, *, n_items: int = 7, n_stores: int = 1, n_months: int = 12,
+                  compat: bool = True, end_month: str = None) -> pd.DataFrame:
     """
-    Generate 12 months of store data for 7 items.
+    Generate ``n_months`` of store data for ``n_items`` items (default: 12 months × 7 items).
     Columns: Month, Item, Category, Sales Quantity, Sales Revenue, COGS, Profit, Inventory Quantity, Marketing Dollars
+    (plus Store when ``n_stores > 1``).
+
+    ``compat=True`` reproduces the legacy random stream exactly (requires ``n_stores == 1`` and
+    ``n_items <= 7``); ``compat=False`` draws whole grids at once and is what larger scenarios use.
+    Months run up to ``end_month`` ("YYYY-MM", default the current month).
     """
-    rng = np.random.default_rng(seed)
-    items = [
-        ("Jeans", "Bottoms", 55.0, 0.55),
-        ("T-Shirts", "Tops", 18.0, 0.45),
-        ("Jackets", "Outerwear", 90.0, 0.60),
-        ("Shoes", "Footwear", 75.0, 0.58),
-        ("Dresses", "Dresses", 70.0, 0.57),
-        ("Accessories", "Accessories", 15.0, 0.40),
-        ("Hoodies", "Tops", 48.0, 0.52),
-    ]
-    end = pd.Timestamp.today().normalize().to_period("M").to_timestamp()
-    months = pd.period_range(end=end, periods=12, freq="M")
-    rows = []
-    seasonal = {m: 0.9 + 0.2 * np.sin(i / 12 * 2 * np.pi) for i, m in enumerate(months)}
-    for m in months:
-        monthly_marketing_pool = rng.uniform(800, 1600)
-        marketing_allocations = rng.dirichlet(np.ones(len(items))) * monthly_marketing_pool
-        for (item, cat, price, cost_ratio), mkt in zip(items, marketing_allocations):
-            base_demand = rng.normal(300, 80)
-            season_factor = seasonal[m]
-            promo_factor = 1.0 + (mkt / monthly_marketing_pool) * 0.3 if monthly_marketing_pool > 0 else 1.0
-            qty = max(0, int(base_demand * season_factor * promo_factor + rng.normal(0, 15)))
-            revenue = qty * price
-            cogs = qty * price * cost_ratio
-            profit = revenue - cogs - mkt
-            inv_qty = max(0, int(qty * rng.uniform(0.4, 0.9) + rng.normal(0, 20)))
-            rows.append({
-                "Month": m.strftime("%Y-%m"),
-                "Item": item,
-                "Category": cat,
-                "Sales Quantity": qty,
-                "Sales Revenue": round(revenue, 2),
-                "COGS": round(cogs, 2),
-                "Profit": round(profit, 2),
-                "Inventory Quantity": inv_qty,
-                "Marketing Dollars": round(mkt, 2),
-            })
-    df = pd.DataFrame(rows)
-    return df
+    names, cats, price, cost_ratio, pool, alloc, noise = _draws(seed, n_items, n_stores, n_months, compat)
+    numeric = {k: v.ravel() for k, v in _figures(price, cost_ratio, pool, alloc, noise).items()}
+    return _frame(_labels(names, cats, n_stores, n_months, end_month), numeric)
+
+def generate_cohort(seeds, *, n_items: int = 7, n_stores: int = 1, n_months: int = 12,
+                    compat: bool = True, end_month: str = None):
+    """Datasets for many seeds at once: ``(labels, numeric)`` where ``labels`` holds the shared
+    Month/Store/Item/Category columns and ``numeric`` maps each NUMERIC column to a
+    (len(seeds), rows) array. Row ``i`` equals ``generate_data(seeds[i], ...)`` exactly; only the
+    random draws run per seed, the arithmetic runs once over the whole batch.
+    """
+    draws = [_draws(seed, n_items, n_stores, n_months, compat) for seed in seeds]
+    if not draws:
+        raise ValueError("generate_cohort needs at least one seed")
+    names, cats = draws[0][:2]
+    price, cost_ratio, pool, alloc, noise = (np.stack([d[i] for d in draws]) for i in range(2, 7))
+    grids = _figures(price[:, None, None, :], cost_ratio[:, None, None, :], pool, alloc, noise)
+    numeric = {k: v.reshape(len(draws), -1) for k, v in grids.items()}
+    return _labels(names, cats, n_stores, n_months, end_month), numeric
@@ -0,0 +1,69 @@
+# datasets.py — shared generate_data frames keyed by seed and scenario parameters
+import hashlib
+import os
+from typing import Tuple
+
+import pandas as pd
+
+from caching import LRUCache, frame_bytes
+from data_generation import generate_data, month_anchor
+
+
+def dataset_key(seed: int = 42, *, n_items: int = 7, n_stores: int = 1, n_months: int = 12,
+                compat: bool = True, end_month: str = None) -> Tuple:
+    """Everything ``generate_data`` output depends on, with the month anchor resolved."""
+    return (int(seed), int(n_items), int(n_stores), int(n_months), bool(compat), month_anchor(end_month))
+
+
+class DatasetCache:
+    """``generate_data`` results bounded by total memory, optionally persisted as Parquet under
+    ``spill_dir`` so other workers and restarts load a file instead of regenerating.
+
+    Frames are shared between callers and must not be modified in place (``apply_transform``
+    returns copies).
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2 ** 20, spill_dir: str = None):
+        if spill_dir:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as exc:
+                raise RuntimeError("DATASET_SPILL_DIR needs pyarrow (pip install pyarrow)") from exc
+            os.makedirs(spill_dir, exist_ok=True)
+        self.spill_dir = spill_dir
+        self.frames = LRUCache(max_bytes, sizeof=frame_bytes)
+
+    @classmethod
+    def from_env(cls) -> "DatasetCache":
+        return cls(int(float(os.environ.get("DATASET_CACHE_MB", "64")) * 2 ** 20),
+                   os.environ.get("DATASET_SPILL_DIR") or None)
+
+    def get(self, seed: int = 42, **params) -> pd.DataFrame:
+        """``generate_data(seed, **params)``, built at most once per key."""
+        key = dataset_key(seed, **params)
+        return self.frames.get_or_build(key, lambda: self._load_or_generate(key))
+
+    def _path(self, key: Tuple) -> str:
+        return os.path.join(self.spill_dir, hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest() + ".parquet")
+
+    def _load_or_generate(self, key: Tuple) -> pd.DataFrame:
+        path = self._path(key) if self.spill_dir else None
+        if path and os.path.exists(path):
+            return _restore(pd.read_parquet(path))
+        seed, n_items, n_stores, n_months, compat, end_month = key
+        df = generate_data(seed, n_items=n_items, n_stores=n_stores, n_months=n_months,
+                           compat=compat, end_month=end_month)
+        if path:
+            tmp = f"{path}.{os.getpid()}.tmp"
+            df.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+        return df
+
+
+def _restore(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast text columns read back from Parquet to ``str``, as generate_data's are (the pandas
+    string dtype under pandas 3, object columns of Python strings before)."""
+    for col in df.columns:
+        if df[col].dtype.kind not in "biuf":
+            df[col] = df[col].astype(str)
+    return df
@@ -0,0 +1,67 @@
+# dbconn.py — SQLite connections shared by every thread and greenlet of a worker process
+#
+# Each store borrows a connection from its database file's pool for one ``with`` block. Keeping
+# connections per thread (threading.local) meant a fresh connect and WAL pragma for every request
+# under gevent workers, where thread-locals are greenlet-local.
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+
+_POOLS: Dict[Tuple[int, str], "ConnectionPool"] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+class ConnectionPool:
+    """Up to ``size`` WAL connections to one SQLite file, opened on demand and reused; a borrower
+    waits when all of them are out."""
+
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self.size = size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for a ``with`` block that, like ``with sqlite3.Connection``, commits
+        on success and rolls back on an exception."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                grow = self._opened < self.size
+                self._opened += grow
+            if grow:
+                try:
+                    conn = self._open()
+                except sqlite3.Error:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                conn = self._idle.get()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._idle.put(conn)
+
+
+def pool(path: str) -> ConnectionPool:
+    """This process's pool for ``path`` (a forked worker gets its own); SQLITE_POOL_SIZE
+    connections per file."""
+    key = (os.getpid(), path)
+    with _POOLS_LOCK:
+        found = _POOLS.get(key)
+        if found is None:
+            found = _POOLS[key] = ConnectionPool(path, int(os.environ.get("SQLITE_POOL_SIZE", "4")))
+    return found
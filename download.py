@@ -0,0 +1,65 @@
+# download.py — on-demand raw-data downloads (CSV / Parquet / XLSX) of a session's current data
+import io
+import os
+
+from flask import Response, abort, request
+
+from caching import LRUCache
+
+FILENAME = "discount4u_raw_data"
+CHUNK_SIZE = 64 * 1024
+MIMETYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+# Serialized files keyed by (data version, format): the data version is a content hash, so every
+# session with the same seed and decisions shares one entry.
+EXPORTS = LRUCache(int(os.environ.get("DOWNLOAD_CACHE_SIZE", "64")))
+
+
+def serialize(df, fmt: str) -> bytes:
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    buf = io.BytesIO()
+    try:
+        if fmt == "parquet":
+            df.to_parquet(buf, index=False)
+        elif fmt == "xlsx":
+            df.to_excel(buf, index=False, sheet_name="Raw Data")
+        else:
+            raise ValueError(f"Unknown download format: {fmt}")
+    except ImportError as exc:
+        raise RuntimeError(f"{fmt} downloads need an extra package ({exc})") from exc
+    return buf.getvalue()
+
+
+def download_href(sid: str, rev: int, fmt: str = "csv") -> str:
+    return f"/download/{sid}.{fmt}?rev={rev}"
+
+
+def register_download_routes(server, sessions) -> None:
+    """Add ``/download/<sid>.<fmt>?rev=N``, serialized lazily on first request and streamed in
+    chunks from the cache afterwards."""
+
+    @server.route("/download/<sid>.<fmt>")
+    def download(sid, fmt):
+        if fmt not in MIMETYPES:
+            abort(404)
+        record = sessions.load(sid, request.args.get("rev", type=int))
+        if record is None:
+            abort(404)
+        try:
+            blob = EXPORTS.get_or_build((record["version"], fmt), lambda: serialize(record["data"], fmt))
+        except RuntimeError as exc:
+            abort(501, description=str(exc))
+
+        def chunks():
+            for i in range(0, len(blob), CHUNK_SIZE):
+                yield blob[i:i + CHUNK_SIZE]
+
+        return Response(chunks(), mimetype=MIMETYPES[fmt], headers={
+            "Content-Disposition": f'attachment; filename="{FILENAME}.{fmt}"',
+            "Cache-Control": "private, no-cache",
+            "ETag": f'"{record["version"]}-{fmt}"',
+        })
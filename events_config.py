@@ -1,4 +1,9 @@
 # events_config.py — student-friendly wording + rich feedback (safe quoting)
+#
+# Each choice's "effects" is applied to the latest month, in order, by events_engine:
+#   {"select": {...}, "qty_mult": .., "price_mult": .., "cost_mult": .., "inv_delta_pct": .., "mkt_delta_mult": ..}
+# Selectors: {"categories": [...]}, {"items": [...]}, {"top_items": n}; add "exclude": True for the
+# complement; {} means every item. "auto_feedback" is the one-line outcome shown after confirming.
 
 EVENTS = {
     "2": {
@@ -13,6 +18,10 @@ EVENTS = {
                 "id": "A",
                 "label": "Pay extra shipping to rush a portion in now.",
                 "transform": "w2_A_expedite_40",
+                "effects": [
+                    {"select": {"categories": ["Tops"]}, "qty_mult": 1.08, "cost_mult": 1.03, "inv_delta_pct": 0.05},
+                ],
+                "auto_feedback": "You protected Tops availability via expedited freight, but incurred higher unit costs.",
                 "student_feedback": [
                     """WHAT YOU DID: You paid for faster shipping so part of the delayed t-shirts arrive sooner.""",
                     """GOOD OUTCOMES: Fewer empty shelves in Tops; more sales captured while demand is hot.""",
@@ -26,6 +35,11 @@ EVENTS = {
                 "id": "B",
                 "label": "Don't rush; instead, discount other categories to shift demand.",
                 "transform": "w2_B_shift_demand_markdown",
+                "effects": [
+                    {"select": {"categories": ["Tops"]}, "qty_mult": 0.90},
+                    {"select": {"categories": ["Tops"], "exclude": True}, "qty_mult": 1.06, "price_mult": 0.95, "inv_delta_pct": -0.04},
+                ],
+                "auto_feedback": "You shifted demand using markdowns; margin compression offset some volume gains.",
                 "student_feedback": [
                     """WHAT YOU DID: You used small discounts elsewhere to steer shoppers to other items while you wait.""",
                     """GOOD OUTCOMES: Cash is preserved (no rush fees) and other categories move faster.""",
@@ -39,6 +53,10 @@ EVENTS = {
                 "id": "C",
                 "label": "Buy a smaller amount from a backup supplier.",
                 "transform": "w2_C_partial_substitute",
+                "effects": [
+                    {"select": {"categories": ["Tops"]}, "qty_mult": 1.03, "cost_mult": 1.08, "inv_delta_pct": -0.02},
+                ],
+                "auto_feedback": "Alternate supplier improved availability slightly at a higher cost; watch quality/returns.",
                 "student_feedback": [
                     """WHAT YOU DID: You sourced about a quarter of the delayed t-shirts from another vendor.""",
                     """GOOD OUTCOMES: Better shelf availability than waiting; some sales protected.""",
@@ -63,6 +81,10 @@ EVENTS = {
                 "id": "A",
                 "label": "Boost online ads for shorts to catch extra demand.",
                 "transform": "w3_A_boost_demand_ads",
+                "effects": [
+                    {"select": {"categories": ["Bottoms"]}, "qty_mult": 1.10, "mkt_delta_mult": 1.20, "inv_delta_pct": -0.03},
+                ],
+                "auto_feedback": "Advertising captured the heat-wave demand for Shorts; higher marketing spend trimmed profit.",
                 "student_feedback": [
                     """WHAT YOU DID: You increased marketing for shorts while demand is naturally higher.""",
                     """GOOD OUTCOMES: More shoppers find shorts; you sell more units while the spike lasts.""",
@@ -76,6 +98,10 @@ EVENTS = {
                 "id": "B",
                 "label": "Limit shorts to 3 per customer to spread stock.",
                 "transform": "w3_B_limit_per_customer",
+                "effects": [
+                    {"select": {"categories": ["Bottoms"]}, "qty_mult": 0.95, "inv_delta_pct": 0.04},
+                ],
+                "auto_feedback": "Purchase limits protected availability but reduced overall units sold slightly.",
                 "student_feedback": [
                     """WHAT YOU DID: You set a fair-purchase limit so more shoppers can find shorts.""",
                     """GOOD OUTCOMES: Fewer stockouts; steadier on-shelf presence.""",
@@ -89,6 +115,10 @@ EVENTS = {
                 "id": "C",
                 "label": "Shift extra shorts from slow stores to hot stores.",
                 "transform": "w3_C_crossdock",
+                "effects": [
+                    {"select": {"categories": ["Bottoms"]}, "qty_mult": 1.06, "cost_mult": 1.01, "inv_delta_pct": -0.05},
+                ],
+                "auto_feedback": "Cross-docking matched supply to demand; minor cost, improved sell-through.",
                 "student_feedback": [
                     """WHAT YOU DID: You moved inventory from where it’s not selling to where it is.""",
                     """GOOD OUTCOMES: Better match of stock to demand; more sales where needed.""",
@@ -113,6 +143,10 @@ EVENTS = {
                 "id": "A",
                 "label": "Pull the batch, fix quality, and re-release slowly.",
                 "transform": "w4_A_rework_quality",
+                "effects": [
+                    {"select": {"categories": ["Tops"]}, "cost_mult": 1.02, "inv_delta_pct": -0.02},
+                ],
+                "auto_feedback": "Quality rework contained the issue and protected brand equity with minor cost impact.",
                 "student_feedback": [
                     """WHAT YOU DID: You took the affected shirts off the floor to repair them before selling again.""",
                     """GOOD OUTCOMES: Protects brand trust; future returns drop.""",
@@ -126,6 +160,10 @@ EVENTS = {
                 "id": "B",
                 "label": "Put that batch on deep discount and clear it fast.",
                 "transform": "w4_B_clearance",
+                "effects": [
+                    {"select": {"categories": ["Tops"]}, "price_mult": 0.80, "qty_mult": 1.12, "inv_delta_pct": -0.12},
+                ],
+                "auto_feedback": "Clearance moved affected inventory quickly but at a steep margin cost.",
                 "student_feedback": [
                     """WHAT YOU DID: You discounted heavily to sell through quickly and move on.""",
                     """GOOD OUTCOMES: Clears the issue and frees up space; fewer complaints later.""",
@@ -139,6 +177,10 @@ EVENTS = {
                 "id": "C",
                 "label": "Ask the supplier for a credit; pause reorders for now.",
                 "transform": "w4_C_credit_pause",
+                "effects": [
+                    {"select": {"categories": ["Tops"]}, "cost_mult": 0.95, "qty_mult": 0.94, "inv_delta_pct": -0.06},
+                ],
+                "auto_feedback": "You recovered some costs via supplier credit but reduced available assortment temporarily.",
                 "student_feedback": [
                     """WHAT YOU DID: You recovered part of your cost via supplier credit and held off future buys.""",
                     """GOOD OUTCOMES: Better cash position; motivates supplier to fix the issue.""",
@@ -163,6 +205,10 @@ EVENTS = {
                 "id": "A",
                 "label": "Hedge about half your exposure (pay a small fee to stabilize cost).",
                 "transform": "w5_A_hedge",
+                "effects": [
+                    {"select": {"categories": ["Tops", "Bottoms"]}, "cost_mult": 1.06, "mkt_delta_mult": 1.05},
+                ],
+                "auto_feedback": "Hedging reduced cost volatility with a modest fee; profit impact is buffered.",
                 "student_feedback": [
                     """WHAT YOU DID: You paid a fee to smooth out cost increases for about half of affected items.""",
                     """GOOD OUTCOMES: More predictable costs; fewer surprises to margin.""",
@@ -176,6 +222,10 @@ EVENTS = {
                 "id": "B",
                 "label": "Raise prices a little (protect margin, keep key value items flat).",
                 "transform": "w5_B_price_up",
+                "effects": [
+                    {"select": {"categories": ["Tops", "Bottoms"]}, "price_mult": 1.028, "qty_mult": 0.97, "inv_delta_pct": 0.02},
+                ],
+                "auto_feedback": "Pricing action protected GM$ with a small demand contraction.",
                 "student_feedback": [
                     """WHAT YOU DID: You raised prices a bit on most affected items, but kept key price points unchanged.""",
                     """GOOD OUTCOMES: Margin dollars protected on many items; revenue can hold up.""",
@@ -189,6 +239,10 @@ EVENTS = {
                 "id": "C",
                 "label": "Use more blended fabrics in place of pure cotton for some items.",
                 "transform": "w5_C_blend_substitute",
+                "effects": [
+                    {"select": {"categories": ["Tops", "Bottoms"]}, "cost_mult": 1.03, "qty_mult": 0.99, "inv_delta_pct": -0.01},
+                ],
+                "auto_feedback": "Material substitution contained costs with minimal demand impact.",
                 "student_feedback": [
                     """WHAT YOU DID: You switched part of the assortment to blends to lower cost pressure.""",
                     """GOOD OUTCOMES: Costs rise less than a full cotton spike; margin pressure softens.""",
@@ -213,6 +267,10 @@ EVENTS = {
                 "id": "A",
                 "label": "Hire temporary help for about 6 weeks.",
                 "transform": "w6_A_temp_staff",
+                "effects": [
+                    {"select": {}, "qty_mult": 1.02, "mkt_delta_mult": 1.04, "inv_delta_pct": -0.02},
+                ],
+                "auto_feedback": "Temporary staffing improved service levels at a modest cost.",
                 "student_feedback": [
                     """WHAT YOU DID: You added temporary staff to speed up outbound work.""",
                     """GOOD OUTCOMES: Better on-time deliveries; fewer stockouts in stores.""",
@@ -226,6 +284,11 @@ EVENTS = {
                 "id": "B",
                 "label": "Prioritize your top-selling items; slower items wait.",
                 "transform": "w6_B_prioritize_top",
+                "effects": [
+                    {"select": {"top_items": 3}, "qty_mult": 1.05, "inv_delta_pct": -0.03},
+                    {"select": {"top_items": 3, "exclude": True}, "qty_mult": 0.97, "inv_delta_pct": 0.02},
+                ],
+                "auto_feedback": "You focused capacity on top items; tail performance softened slightly.",
                 "student_feedback": [
                     """WHAT YOU DID: You focused limited capacity on your most popular items.""",
                     """GOOD OUTCOMES: Best sellers stay in stock; top-line impact is protected.""",
@@ -239,6 +302,10 @@ EVENTS = {
                 "id": "C",
                 "label": "Let suppliers ship a small set directly to customers (drop-ship).",
                 "transform": "w6_C_dropship",
+                "effects": [
+                    {"select": {}, "qty_mult": 1.02, "cost_mult": 1.015},
+                ],
+                "auto_feedback": "Drop-ship reduced DC load and improved speed for a subset, with slightly higher cost.",
                 "student_feedback": [
                     """WHAT YOU DID: You let suppliers ship certain items directly to customers.""",
                     """GOOD OUTCOMES: Takes load off your warehouse; faster for those items.""",
@@ -263,6 +330,10 @@ EVENTS = {
                 "id": "A",
                 "label": "Run selective discounts + extra loyalty points on key items.",
                 "transform": "w7_A_counter_promo",
+                "effects": [
+                    {"select": {"categories": ["Tops", "Bottoms", "Accessories"]}, "price_mult": 0.95, "qty_mult": 1.08, "inv_delta_pct": -0.05, "mkt_delta_mult": 1.05},
+                ],
+                "auto_feedback": "Counter-promo defended share with a trade-off in margin percentage.",
                 "student_feedback": [
                     """WHAT YOU DID: You matched in a focused way on a few items and rewarded loyal customers.""",
                     """GOOD OUTCOMES: Keeps shoppers from switching; unit sales rise on targeted SKUs.""",
@@ -276,6 +347,11 @@ EVENTS = {
                 "id": "B",
                 "label": "Stand out with a small premium collection; cut weak sellers.",
                 "transform": "w7_B_differentiate",
+                "effects": [
+                    {"select": {"categories": ["Outerwear", "Footwear", "Dresses"]}, "price_mult": 1.06, "qty_mult": 0.98},
+                    {"select": {"categories": ["Accessories"]}, "inv_delta_pct": -0.10, "qty_mult": 0.98},
+                ],
+                "auto_feedback": "Assortment focused on premium; GM$ stabilized despite softer units.",
                 "student_feedback": [
                     """WHAT YOU DID: You leaned into premium choices and trimmed slow SKUs to focus your offer.""",
                     """GOOD OUTCOMES: Stronger brand feel; higher average price can support profit dollars.""",
@@ -289,6 +365,10 @@ EVENTS = {
                 "id": "C",
                 "label": "Focus on the experience (events, staff styling, micro-influencers).",
                 "transform": "w7_C_experience_led",
+                "effects": [
+                    {"select": {}, "qty_mult": 1.04, "mkt_delta_mult": 1.08, "inv_delta_pct": -0.03},
+                ],
+                "auto_feedback": "Experience strategy grew traffic with limited discounting; benefits may compound over time.",
                 "student_feedback": [
                     """WHAT YOU DID: You invested in events and social buzz instead of heavy discounts.""",
                     """GOOD OUTCOMES: More traffic and engagement; less pressure on prices.""",
@@ -3,170 +3,258 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any
 
+from events_config import EVENTS
+
 def _latest_month(df: pd.DataFrame) -> str:
-    months = pd.to_datetime(df["Month"], format="%Y-%m")
-    return months.max().strftime("%Y-%m")
-
-def _add_unit_cols(dff: pd.DataFrame) -> pd.DataFrame:
-    dff = dff.copy()
-    qty = dff["Sales Quantity"].replace(0, np.nan)
-    dff["unit_price"] = dff["Sales Revenue"] / qty
-    dff["unit_cost"]  = dff["COGS"] / qty
-    dff["unit_price"] = dff["unit_price"].fillna(dff["unit_price"].median())
-    dff["unit_cost"]  = dff["unit_cost"].fillna(dff["unit_cost"].median())
-    return dff
-
-def _recalc_financials(dff: pd.DataFrame) -> pd.DataFrame:
-    dff = dff.copy()
-    dff["Sales Revenue"] = (dff["Sales Quantity"] * dff["unit_price"]).round(2)
-    dff["COGS"]          = (dff["Sales Quantity"] * dff["unit_cost"]).round(2)
-    dff["Profit"]        = (dff["Sales Revenue"] - dff["COGS"] - dff["Marketing Dollars"]).round(2)
-    return dff
+    # "%Y-%m" labels sort chronologically, so no datetime parse is needed.
+    return df["Month"].max()
+
+def _unit_arrays(qty: np.ndarray, revenue: np.ndarray, cogs: np.ndarray):
+    q = np.where(qty == 0, np.nan, qty.astype(float))
+    unit_price = revenue / q
+    unit_cost = cogs / q
+    if np.isnan(q).any():
+        unit_price = np.where(np.isnan(unit_price), np.nanmedian(unit_price), unit_price)
+        unit_cost = np.where(np.isnan(unit_cost), np.nanmedian(unit_cost), unit_cost)
+    return unit_price, unit_cost
 
 def _delta_summary(before: pd.DataFrame, after: pd.DataFrame) -> Dict[str, Any]:
     keys = ["Sales Quantity", "Sales Revenue", "COGS", "Profit", "Inventory Quantity", "Marketing Dollars"]
-    b = before[keys].sum(numeric_only=True)
-    a = after[keys].sum(numeric_only=True)
-    d = (a - b).to_dict()
+    # Column-wise NumPy sums: same values as DataFrame.sum() without its per-call overhead.
+    b = dict(zip(keys, np.array([before[k].to_numpy().sum() for k in keys], dtype=float).tolist()))
+    a = dict(zip(keys, np.array([after[k].to_numpy().sum() for k in keys], dtype=float).tolist()))
+    d = {k: a[k] - b[k] for k in keys}
     d["Revenue %"] = float(((a["Sales Revenue"] - b["Sales Revenue"]) / b["Sales Revenue"]) * 100.0) if b["Sales Revenue"] else 0.0
     d["Profit %"]  = float(((a["Profit"] - b["Profit"]) / b["Profit"]) * 100.0) if b["Profit"] else 0.0
     return {k: (round(v, 2) if isinstance(v, (int, float, np.floating)) else v) for k, v in d.items()}
 
+def _apply_stages(df: pd.DataFrame, stages, latest_rows: np.ndarray = None) -> pd.DataFrame:
+    """Apply ``[(mask, {qty_mult, price_mult, cost_mult, inv_delta_pct, mkt_delta_mult}), ...]`` to the
+    latest month in one pass over NumPy arrays with a single DataFrame copy.
+
+    Each stage re-derives unit price/cost from the previous stage's rounded financials, exactly as
+    chaining ``_apply_on_latest`` calls does, so multi-step transforms keep their historical outputs.
+    """
+    if latest_rows is None:
+        latest = df["Month"].to_numpy() == _latest_month(df)
+    else:
+        latest = np.zeros(len(df), dtype=bool)
+        latest[latest_rows] = True
+    qty = df["Sales Quantity"].to_numpy(copy=True)
+    inv = df["Inventory Quantity"].to_numpy(copy=True)
+    mkt = df["Marketing Dollars"].to_numpy(dtype=float, copy=True)
+    revenue = df["Sales Revenue"].to_numpy(dtype=float)
+    cogs = df["COGS"].to_numpy(dtype=float)
+    for mask, mults in stages:
+        m = latest & np.asarray(mask, dtype=bool)
+        unit_price, unit_cost = _unit_arrays(qty, revenue, cogs)
+        qty[m] = np.round(qty[m] * mults.get("qty_mult", 1.0)).astype(qty.dtype)
+        unit_price[m] *= mults.get("price_mult", 1.0)
+        unit_cost[m] *= mults.get("cost_mult", 1.0)
+        mkt[m] = np.round(mkt[m] * mults.get("mkt_delta_mult", 1.0), 2)
+        inv[m] = np.round(inv[m] * (1.0 + mults.get("inv_delta_pct", 0.0))).astype(inv.dtype)
+        revenue = np.round(qty * unit_price, 2)
+        cogs = np.round(qty * unit_cost, 2)
+    out = df.copy()
+    out["Sales Quantity"] = qty
+    out["Sales Revenue"] = revenue
+    out["COGS"] = cogs
+    out["Profit"] = np.round(revenue - cogs - mkt, 2)
+    out["Inventory Quantity"] = inv
+    out["Marketing Dollars"] = mkt
+    return out
+
 def _apply_on_latest(df: pd.DataFrame, mask: pd.Series, *,
                      qty_mult: float = 1.0,
                      price_mult: float = 1.0,
                      cost_mult: float = 1.0,
                      inv_delta_pct: float = 0.0,
                      mkt_delta_mult: float = 1.0) -> pd.DataFrame:
-    latest = _latest_month(df)
-    dff = df.copy()
-    latest_mask = dff["Month"].eq(latest) & mask
-    dff = _add_unit_cols(dff)
-    dff.loc[latest_mask, "Sales Quantity"] = (dff.loc[latest_mask, "Sales Quantity"] * qty_mult).round().astype(int)
-    dff.loc[latest_mask, "unit_price"]     = dff.loc[latest_mask, "unit_price"] * price_mult
-    dff.loc[latest_mask, "unit_cost"]      = dff.loc[latest_mask, "unit_cost"] * cost_mult
-    dff.loc[latest_mask, "Marketing Dollars"] = (dff.loc[latest_mask, "Marketing Dollars"] * mkt_delta_mult).round(2)
-    dff.loc[latest_mask, "Inventory Quantity"] = (
-        dff.loc[latest_mask, "Inventory Quantity"] * (1.0 + inv_delta_pct)
-    ).round().astype(int)
-    dff = _recalc_financials(dff)
-    return dff.drop(columns=["unit_price", "unit_cost"])  # cleanup
-
-def _before_after(df):
-    latest = _latest_month(df)
-    return df[df["Month"].eq(latest)].copy(), latest
-
-# Week 2
-
-def w2_A_expedite_40(df: pd.DataFrame):
-    before, latest = _before_after(df); tops = df["Category"].eq("Tops")
-    out = _apply_on_latest(df, tops, qty_mult=1.08, cost_mult=1.03, inv_delta_pct=0.05)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "You protected Tops availability via expedited freight, but incurred higher unit costs."
-
-def w2_B_shift_demand_markdown(df: pd.DataFrame):
-    before, latest = _before_after(df); tops = df["Category"].eq("Tops"); non_tops = ~tops
-    df2 = _apply_on_latest(df, tops, qty_mult=0.90)
-    out = _apply_on_latest(df2, non_tops, qty_mult=1.06, price_mult=0.95, inv_delta_pct=-0.04)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "You shifted demand using markdowns; margin compression offset some volume gains."
-
-def w2_C_partial_substitute(df: pd.DataFrame):
-    before, latest = _before_after(df); tops = df["Category"].eq("Tops")
-    out = _apply_on_latest(df, tops, qty_mult=1.03, cost_mult=1.08, inv_delta_pct=-0.02)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "Alternate supplier improved availability slightly at a higher cost; watch quality/returns."
-
-# Week 3
-
-def w3_A_boost_demand_ads(df):
-    before, latest = _before_after(df); bottoms = df["Category"].eq("Bottoms")
-    out = _apply_on_latest(df, bottoms, qty_mult=1.10, mkt_delta_mult=1.20, inv_delta_pct=-0.03)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "Advertising captured the heat-wave demand for Shorts; higher marketing spend trimmed profit."
-
-def w3_B_limit_per_customer(df):
-    before, latest = _before_after(df); bottoms = df["Category"].eq("Bottoms")
-    out = _apply_on_latest(df, bottoms, qty_mult=0.95, inv_delta_pct=0.04)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "Purchase limits protected availability but reduced overall units sold slightly."
-
-def w3_C_crossdock(df):
-    before, latest = _before_after(df); bottoms = df["Category"].eq("Bottoms")
-    out = _apply_on_latest(df, bottoms, qty_mult=1.06, cost_mult=1.01, inv_delta_pct=-0.05)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "Cross-docking matched supply to demand; minor cost, improved sell-through."
-
-# Week 4
-
-def w4_A_rework_quality(df):
-    before, latest = _before_after(df); tops = df["Category"].eq("Tops")
-    out = _apply_on_latest(df, tops, cost_mult=1.02, inv_delta_pct=-0.02)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "Quality rework contained the issue and protected brand equity with minor cost impact."
-
-def w4_B_clearance(df):
-    before, latest = _before_after(df); tops = df["Category"].eq("Tops")
-    out = _apply_on_latest(df, tops, price_mult=0.80, qty_mult=1.12, inv_delta_pct=-0.12)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "Clearance moved affected inventory quickly but at a steep margin cost."
-
-def w4_C_credit_pause(df):
-    before, latest = _before_after(df); tops = df["Category"].eq("Tops")
-    out = _apply_on_latest(df, tops, cost_mult=0.95, qty_mult=0.94, inv_delta_pct=-0.06)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "You recovered some costs via supplier credit but reduced available assortment temporarily."
-
-# Week 5
-
-def w5_A_hedge(df):
-    before, latest = _before_after(df); mask = df["Category"].isin(["Tops","Bottoms"])
-    out = _apply_on_latest(df, mask, cost_mult=1.06, mkt_delta_mult=1.05)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "Hedging reduced cost volatility with a modest fee; profit impact is buffered."
-
-def w5_B_price_up(df):
-    before, latest = _before_after(df); mask = df["Category"].isin(["Tops","Bottoms"])
-    out = _apply_on_latest(df, mask, price_mult=1.028, qty_mult=0.97, inv_delta_pct=0.02)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "Pricing action protected GM$ with a small demand contraction."
-
-def w5_C_blend_substitute(df):
-    before, latest = _before_after(df); mask = df["Category"].isin(["Tops","Bottoms"])
-    out = _apply_on_latest(df, mask, cost_mult=1.03, qty_mult=0.99, inv_delta_pct=-0.01)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "Material substitution contained costs with minimal demand impact."
-
-# Week 6
-
-def w6_A_temp_staff(df):
-    before, latest = _before_after(df); mask = df["Month"].eq(latest)
-    out = _apply_on_latest(df, mask, qty_mult=1.02, mkt_delta_mult=1.04, inv_delta_pct=-0.02)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "Temporary staffing improved service levels at a modest cost."
-
-def w6_B_prioritize_top(df):
-    before, latest = _before_after(df); last = df[df["Month"].eq(latest)].copy()
-    top_items = last.groupby("Item")["Sales Quantity"].sum().nlargest(3).index.tolist()
-    high = df["Item"].isin(top_items); low = ~high
-    df2 = _apply_on_latest(df, high, qty_mult=1.05, inv_delta_pct=-0.03)
-    out = _apply_on_latest(df2, low, qty_mult=0.97, inv_delta_pct=0.02)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "You focused capacity on top items; tail performance softened slightly."
-
-def w6_C_dropship(df):
-    before, latest = _before_after(df); mask = df["Month"].eq(latest)
-    out = _apply_on_latest(df, mask, qty_mult=1.02, cost_mult=1.015)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "Drop-ship reduced DC load and improved speed for a subset, with slightly higher cost."
-
-# Week 7
-
-def w7_A_counter_promo(df):
-    before, latest = _before_after(df); mask = df["Category"].isin(["Tops","Bottoms","Accessories"])
-    out = _apply_on_latest(df, mask, price_mult=0.95, qty_mult=1.08, inv_delta_pct=-0.05, mkt_delta_mult=1.05)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "Counter-promo defended share with a trade-off in margin percentage."
-
-def w7_B_differentiate(df):
-    before, latest = _before_after(df); premium = df["Category"].isin(["Outerwear","Footwear","Dresses"]); tail = df["Category"].isin(["Accessories"])
-    df2 = _apply_on_latest(df, premium, price_mult=1.06, qty_mult=0.98)
-    out = _apply_on_latest(df2, tail, inv_delta_pct=-0.10, qty_mult=0.98)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "Assortment focused on premium; GM$ stabilized despite softer units."
-
-def w7_C_experience_led(df):
-    before, latest = _before_after(df); mask = df["Month"].eq(latest)
-    out = _apply_on_latest(df, mask, qty_mult=1.04, mkt_delta_mult=1.08, inv_delta_pct=-0.03)
-    return out, _delta_summary(before, out[out["Month"].eq(latest)]), "Experience strategy grew traffic with limited discounting; benefits may compound over time."
-
-FUNCTIONS = {name: obj for name, obj in globals().items() if callable(obj) and name.startswith("w")}
-
-def apply_transform(df: pd.DataFrame, transform_name: str):
-    fn = FUNCTIONS.get(transform_name)
+    return _apply_stages(df, [(mask, {
+        "qty_mult": qty_mult, "price_mult": price_mult, "cost_mult": cost_mult,
+        "inv_delta_pct": inv_delta_pct, "mkt_delta_mult": mkt_delta_mult,
+    })])
+
+# Transforms are declared as "effects" on each choice in events_config.EVENTS (schema documented
+# there) and compiled once into FUNCTIONS: transform name -> callable(df) -> (df, delta, feedback).
+
+MULTIPLIERS = ("qty_mult", "price_mult", "cost_mult", "inv_delta_pct", "mkt_delta_mult")
+_SELECTOR_KEYS = {"categories", "items", "top_items", "exclude"}
+
+def _latest_rows(df: pd.DataFrame) -> np.ndarray:
+    month = df["Month"].to_numpy()
+    return np.flatnonzero(month == month.max())
+
+def _compile_selector(sel: Dict[str, Any]):
+    unknown = set(sel) - _SELECTOR_KEYS
+    if unknown:
+        raise ValueError(f"Unknown selector keys: {sorted(unknown)}")
+    if len(set(sel) & {"categories", "items", "top_items"}) > 1:
+        raise ValueError("A selector takes only one of categories, items, top_items")
+    if "categories" in sel:
+        return ("Category", tuple(sel["categories"]), None, bool(sel.get("exclude")))
+    if "items" in sel:
+        return ("Item", tuple(sel["items"]), None, bool(sel.get("exclude")))
+    if "top_items" in sel:
+        return ("Item", None, int(sel["top_items"]), bool(sel.get("exclude")))
+    return (None, None, None, bool(sel.get("exclude")))
+
+def _select(latest: pd.DataFrame, selector) -> np.ndarray:
+    column, values, top_n, exclude = selector
+    if top_n is not None:
+        values = latest.groupby("Item")["Sales Quantity"].sum().nlargest(top_n).index.to_numpy()
+    if column is None:
+        hit = np.ones(len(latest), dtype=bool)
+    else:
+        hit = np.isin(latest[column].to_numpy(), values)
+    return ~hit if exclude else hit
+
+def _run_effects(df: pd.DataFrame, stages, auto_feedback: str):
+    rows = _latest_rows(df)
+    before = df.iloc[rows]
+    masks = []
+    for selector, mults in stages:
+        mask = np.zeros(len(df), dtype=bool)
+        mask[rows[_select(before, selector)]] = True
+        masks.append((mask, mults))
+    out = _apply_stages(df, masks, latest_rows=rows)
+    return out, _delta_summary(before, out.iloc[rows]), auto_feedback
+
+def _compile_choice(choice: Dict[str, Any]):
+    stages = []
+    for effect in choice["effects"]:
+        unknown = set(effect) - set(MULTIPLIERS) - {"select"}
+        if unknown:
+            raise ValueError(f"{choice['transform']}: unknown effect keys {sorted(unknown)}")
+        stages.append((_compile_selector(effect.get("select", {})),
+                       {k: float(effect[k]) for k in MULTIPLIERS if k in effect}))
+    auto_feedback = choice.get("auto_feedback", "")
+
+    def transform(df: pd.DataFrame):
+        return _run_effects(df, stages, auto_feedback)
+    transform.__name__ = choice["transform"]
+    transform.stages = stages
+    transform.auto_feedback = auto_feedback
+    return transform
+
+def compile_events(events: Dict[str, Any]) -> Dict[str, Any]:
+    """Compile every choice with "effects" in a scenario pack into a {transform name: callable} table."""
+    table, specs = {}, {}
+    for ev in events.values():
+        for choice in ev["choices"]:
+            if "effects" not in choice:
+                continue
+            name = choice["transform"]
+            spec = (choice["effects"], choice.get("auto_feedback", ""))
+            if name in specs and specs[name] != spec:
+                raise ValueError(f"Transform {name} is defined twice with different effects")
+            specs[name] = spec
+            table[name] = _compile_choice(choice)
+    return table
+
+FUNCTIONS = compile_events(EVENTS)
+
+def apply_transform(df: pd.DataFrame, transform_name: str, transforms: Dict[str, Any] = None):
+    fn = (FUNCTIONS if transforms is None else transforms).get(transform_name)
     if not fn:
         raise ValueError(f"Unknown transform: {transform_name}")
     return fn(df)
+
+def _history_units(df: pd.DataFrame, rows: np.ndarray, depth: int):
+    """Unit price/cost of the non-latest rows after ``depth`` recalc passes (NaN where qty is 0).
+
+    Only needed for the median fill of zero-quantity latest rows, which the single-frame kernel
+    takes over the whole frame."""
+    hist = np.ones(len(df), dtype=bool)
+    hist[rows] = False
+    qty = df["Sales Quantity"].to_numpy()[hist]
+    revenue = df["Sales Revenue"].to_numpy(dtype=float)[hist]
+    cogs = df["COGS"].to_numpy(dtype=float)[hist]
+    q = np.where(qty == 0, np.nan, qty.astype(float))
+    for _ in range(depth):
+        unit_price, unit_cost = _unit_arrays(qty, revenue, cogs)
+        revenue = np.round(qty * unit_price, 2)
+        cogs = np.round(qty * unit_cost, 2)
+    return revenue / q, cogs / q
+
+def _apply_stages_batch(df: pd.DataFrame, rows: np.ndarray, before: pd.DataFrame, stage_lists):
+    """Run several stage lists on the latest-month rows at once as (n_choices, n_rows) arrays.
+
+    Row-for-row identical to ``_apply_stages`` on the full frame for each stage list."""
+    k = len(stage_lists)
+    qty = np.tile(before["Sales Quantity"].to_numpy(), (k, 1))
+    inv = np.tile(before["Inventory Quantity"].to_numpy(), (k, 1))
+    mkt = np.tile(before["Marketing Dollars"].to_numpy(dtype=float), (k, 1))
+    revenue = np.tile(before["Sales Revenue"].to_numpy(dtype=float), (k, 1))
+    cogs = np.tile(before["COGS"].to_numpy(dtype=float), (k, 1))
+    selections = {}
+    for depth in range(max((len(sl) for sl in stage_lists), default=0)):
+        active = np.array([depth < len(sl) for sl in stage_lists])
+        mask = np.zeros(qty.shape, dtype=bool)
+        mults = {m: np.full(k, 0.0 if m == "inv_delta_pct" else 1.0) for m in MULTIPLIERS}
+        for j, sl in enumerate(stage_lists):
+            if depth < len(sl):
+                selector, stage_mults = sl[depth]
+                if selector not in selections:
+                    selections[selector] = _select(before, selector)
+                mask[j] = selections[selector]
+                for key, value in stage_mults.items():
+                    mults[key][j] = value
+
+        zero = qty == 0
+        q = np.where(zero, np.nan, qty.astype(float))
+        unit_price = revenue / q
+        unit_cost = cogs / q
+        zero_choices = np.flatnonzero(zero.any(axis=1))
+        if zero_choices.size:
+            hist_price, hist_cost = _history_units(df, rows, depth)
+        for j in zero_choices:
+            unit_price[j, zero[j]] = np.nanmedian(np.concatenate([hist_price, unit_price[j]]))
+            unit_cost[j, zero[j]] = np.nanmedian(np.concatenate([hist_cost, unit_cost[j]]))
+
+        qty = np.where(mask, np.round(qty * mults["qty_mult"][:, None]).astype(qty.dtype), qty)
+        unit_price = np.where(mask, unit_price * mults["price_mult"][:, None], unit_price)
+        unit_cost = np.where(mask, unit_cost * mults["cost_mult"][:, None], unit_cost)
+        mkt = np.where(mask, np.round(mkt * mults["mkt_delta_mult"][:, None], 2), mkt)
+        inv = np.where(mask, np.round(inv * (1.0 + mults["inv_delta_pct"])[:, None]).astype(inv.dtype), inv)
+        revenue = np.where(active[:, None], np.round(qty * unit_price, 2), revenue)
+        cogs = np.where(active[:, None], np.round(qty * unit_cost, 2), cogs)
+    return {
+        "Sales Quantity": qty,
+        "Sales Revenue": revenue,
+        "COGS": cogs,
+        "Profit": np.round(revenue - cogs - mkt, 2),
+        "Inventory Quantity": inv,
+        "Marketing Dollars": mkt,
+    }
+
+def evaluate_choices(df: pd.DataFrame, week=None, transform_names=None,
+                     events: Dict[str, Any] = None, transforms: Dict[str, Any] = None):
+    """Evaluate every choice of ``events[week]`` (or the given transform names) on ``df`` in one batch.
+
+    Returns ``(stacked, deltas)``: the latest-month rows after each transform with a leading
+    "Transform" column, and the ``_delta_summary`` of each transform indexed by name. Each slice of
+    ``stacked`` equals the latest month of ``apply_transform(df, name)[0]``.
+    """
+    if transform_names is None:
+        if week is None:
+            raise ValueError("Pass a week or transform_names")
+        transform_names = [c["transform"] for c in (EVENTS if events is None else events)[str(week)]["choices"]]
+    table = FUNCTIONS if transforms is None else transforms
+    unknown = [name for name in transform_names if name not in table]
+    if unknown:
+        raise ValueError(f"Unknown transform: {unknown[0]}")
+
+    rows = _latest_rows(df)
+    before = df.iloc[rows]
+    arrays = _apply_stages_batch(df, rows, before, [table[name].stages for name in transform_names])
+    n = len(rows)
+    stacked = before.iloc[np.tile(np.arange(n), len(transform_names))].reset_index(drop=True)
+    for col, values in arrays.items():
+        stacked[col] = values.ravel()
+    stacked.insert(0, "Transform", np.repeat(np.array(transform_names, dtype=object), n))
+    deltas = pd.DataFrame(
+        [_delta_summary(before, stacked.iloc[j * n:(j + 1) * n]) for j in range(len(transform_names))],
+        index=pd.Index(transform_names, name="Transform"),
+    )
+    return stacked, deltas
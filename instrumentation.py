@@ -0,0 +1,201 @@
+# instrumentation.py — per-callback latency / payload histograms, a Prometheus /metrics route and
+# an optional sampling profiler
+#
+# Metrics are per worker process (each gunicorn worker answers /metrics for itself); scrape each
+# worker, or aggregate in Prometheus by instance.
+import bisect
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from flask import Response, abort, g, request
+
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+SIZE_BUCKETS = [256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304]
+UPDATE_PATH = "/_dash-update-component"
+
+
+class Histogram:
+    """Prometheus-style histogram keyed by a label tuple."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str], buckets: List[float]):
+        self.name, self.help, self.labels, self.buckets = name, help_text, tuple(labels), buckets
+        self._series: Dict[Tuple, list] = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, list(v)) for k, v in sorted(self._series.items())]
+        for labels, series in items:
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, labels))
+            sep = "," if base else ""
+            total = 0
+            for bound, count in zip(self.buckets + ["+Inf"], series[:-1]):
+                total += count
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {total}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{base}}} {total}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+CALLBACK_SECONDS = Histogram("dash_callback_duration_seconds", "Server time per callback request.",
+                             ["callback", "status"], LATENCY_BUCKETS)
+REQUEST_BYTES = Histogram("dash_callback_request_bytes", "Callback request body size.",
+                          ["callback"], SIZE_BUCKETS)
+RESPONSE_BYTES = Histogram("dash_callback_response_bytes", "Callback response body size.",
+                           ["callback"], SIZE_BUCKETS)
+FRAME_SECONDS = Histogram("dataframe_build_seconds", "Time spent loading or building DataFrames.",
+                          ["stage"], LATENCY_BUCKETS)
+HISTOGRAMS = [CALLBACK_SECONDS, REQUEST_BYTES, RESPONSE_BYTES, FRAME_SECONDS]
+
+
+@contextmanager
+def timed(stage: str):
+    """Record the duration of the enclosed block under ``dataframe_build_seconds{stage=...}``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        FRAME_SECONDS.observe((stage,), time.perf_counter() - start)
+
+
+class SamplingProfiler:
+    """cProfile a random ``rate`` fraction of callback requests into one cumulative Stats.
+
+    Only one request is profiled at a time (the interpreter allows a single active profiler).
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._busy = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = None
+        self.samples = 0
+
+    def start(self):
+        if self.rate <= 0 or random.random() >= self.rate or not self._busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler is active in this process
+            self._busy.release()
+            return None
+        return profile
+
+    def stop(self, profile) -> None:
+        profile.disable()
+        self._busy.release()
+        with self._stats_lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self.samples += 1
+
+    def report(self, limit: int = 40) -> str:
+        with self._stats_lock:
+            if self._stats is None:
+                return "no samples yet\n"
+            out = io.StringIO()
+            self._stats.stream = out
+            self._stats.sort_stats("cumulative").print_stats(limit)
+        return f"{self.samples} sampled requests\n" + out.getvalue()
+
+
+def _matches_any(secret: str, candidates: Iterable[str]) -> bool:
+    secret = (secret or "").encode()
+    found = False
+    for candidate in candidates:  # no early exit: the time taken doesn't say which one matched
+        found |= bool(candidate) and hmac.compare_digest(secret, candidate.encode())
+    return found
+
+
+def register_metrics(app, server, profile_rate: float = None, pins: Callable[[], Iterable[str]] = lambda: (),
+                     token: str = None) -> SamplingProfiler:
+    """Time every ``/_dash-update-component`` request by callback, and add ``/metrics``
+    (Prometheus text) and, when profiling is on, ``/metrics/profile`` (sampled cProfile report) to
+    ``server``. Both answer only callers sending ``Authorization: Bearer <token>`` (METRICS_TOKEN,
+    for the scraper) or one of ``pins()`` in ``X-Instructor-Pin``."""
+    rate = float(os.environ.get("PROFILE_SAMPLE_RATE", "0")) if profile_rate is None else profile_rate
+    token = os.environ.get("METRICS_TOKEN") if token is None else token
+    profiler = SamplingProfiler(rate)
+    names: Dict[str, str] = {}
+
+    def callback_name(output: str) -> str:
+        name = names.get(output)
+        if name is None:
+            if output not in app.callback_map:
+                return "unknown"  # not cached: arbitrary request bodies must not grow the label set
+            name = names[output] = getattr(app.callback_map[output].get("callback"), "__name__", output)
+        return name
+
+    @server.before_request
+    def _start_timer():
+        if request.path == UPDATE_PATH:
+            g.metrics_start = time.perf_counter()
+            g.metrics_profile = profiler.start()
+
+    @server.after_request
+    def _record(response):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return response
+        body = request.get_json(silent=True) or {}
+        name = callback_name(body.get("output", "?"))
+        CALLBACK_SECONDS.observe((name, str(response.status_code)), time.perf_counter() - start)
+        REQUEST_BYTES.observe((name,), request.content_length or 0)
+        size = response.calculate_content_length()
+        if size is not None:
+            RESPONSE_BYTES.observe((name,), size)
+        return response
+
+    @server.teardown_request
+    def _stop_profile(_exc):
+        profile = g.pop("metrics_profile", None)
+        if profile is not None:
+            profiler.stop(profile)
+
+    def _authorize():
+        bearer = request.headers.get("Authorization", "")
+        if token and bearer.startswith("Bearer ") and _matches_any(bearer[7:], [token]):
+            return
+        if not _matches_any(request.headers.get("X-Instructor-Pin"), pins()):
+            abort(403)
+
+    @server.route("/metrics")
+    def metrics():
+        _authorize()
+        lines = [line for h in HISTOGRAMS for line in h.render()]
+        return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+    if rate <= 0:
+        return profiler
+
+    @server.route("/metrics/profile")
+    def metrics_profile():
+        _authorize()
+        return Response(profiler.report(request.args.get("limit", 40, type=int)), mimetype="text/plain")
+
+    return profiler
@@ -0,0 +1,85 @@
+# replay.py — event-sourced session state: a base dataset plus the ordered decisions taken on it
+#
+# A record keeps {"base": {"seed", "params"[, "student"]}, "decisions": [[week, transform], ...]}
+# instead of its post-decision frame, plus a checkpoint of the materialized frame every
+# SNAPSHOT_EVERY decisions ("snapshot", taken after "snapshot_at" decisions). SessionStore rebuilds
+# "data" on load with Replayer.frame, so a record holds at most one frame however many weeks a
+# scenario pack has.
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from caching import LRUCache, frame_bytes
+from datasets import dataset_key
+from events_engine import apply_transform
+
+
+def base_key(base: Dict[str, Any]) -> Tuple:
+    """Cache key of a base spec: everything its generated frame depends on."""
+    return dataset_key(base["seed"], **base.get("params", {}))
+
+
+def _steps(decisions: Sequence) -> Tuple:
+    return tuple((int(week), transform) for week, transform in decisions)
+
+
+class Replayer:
+    """Rebuilds frames from a base spec and decisions.
+
+    Every frame along a replay is cached under (base, decisions so far), bounded by total bytes and
+    shared by the worker's sessions: students who chose alike share one copy, and a replay starts
+    from the longest cached prefix, else the record's snapshot, else the base.
+    """
+
+    def __init__(self, load_base: Callable[[Dict[str, Any]], pd.DataFrame],
+                 max_bytes: int = 64 * 2 ** 20, snapshot_every: int = 3, transforms: Dict[str, Any] = None):
+        if snapshot_every < 1:
+            raise ValueError("snapshot_every must be at least 1")
+        self.load_base = load_base
+        self.snapshot_every = snapshot_every
+        self.transforms = transforms  # scenario pack's compiled transforms; None: events_engine.FUNCTIONS
+        self.frames = LRUCache(max_bytes, sizeof=frame_bytes)
+
+    @classmethod
+    def from_env(cls, load_base, transforms: Dict[str, Any] = None, max_mb: float = None) -> "Replayer":
+        if max_mb is None:
+            max_mb = float(os.environ.get("REPLAY_CACHE_MB", "64"))
+        return cls(load_base, int(max_mb * 2 ** 20), int(os.environ.get("SNAPSHOT_EVERY", "3")), transforms)
+
+    def replay(self, base: Dict[str, Any], decisions: Sequence, snapshot: Optional[pd.DataFrame] = None,
+               snapshot_at: int = 0) -> pd.DataFrame:
+        """The frame after applying ``decisions`` (``[(week, transform), ...]``) to ``base`` in order.
+
+        Any prefix is a valid replay, e.g. ``decisions[:n]`` for the state before week n + 2.
+        """
+        root, steps = base_key(base), _steps(decisions)
+        for start in range(len(steps), -1, -1):
+            df = self.frames.get((root, steps[:start]))
+            if df is not None:
+                break
+            if snapshot is not None and start == snapshot_at:
+                df = snapshot
+                break
+        else:
+            start, df = 0, self.load_base(base)
+        for n in range(start, len(steps)):
+            df = apply_transform(df, steps[n][1], self.transforms)[0]
+            self.frames.put((root, steps[:n + 1]), df)
+        return df
+
+    def frame(self, record: Dict[str, Any]) -> pd.DataFrame:
+        """Current frame of an event-sourced session record."""
+        return self.replay(record["base"], record["decisions"], record.get("snapshot"), record.get("snapshot_at", 0))
+
+    def advance(self, record: Dict[str, Any], week: int, transform: str, frame: pd.DataFrame) -> Dict[str, Any]:
+        """Record fields after ``transform`` was chosen in ``week`` and produced ``frame``: the
+        decision appended, ``frame`` cached as that prefix and checkpointed every ``snapshot_every``
+        decisions."""
+        decisions: List[list] = [list(d) for d in record["decisions"]] + [[int(week), transform]]
+        self.frames.put((base_key(record["base"]), _steps(decisions)), frame)
+        fields = {"base": record["base"], "decisions": decisions, "data": frame,
+                  "snapshot": record.get("snapshot"), "snapshot_at": record.get("snapshot_at", 0)}
+        if len(decisions) % self.snapshot_every == 0:
+            fields.update(snapshot=frame, snapshot_at=len(decisions))
+        return fields
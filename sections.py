@@ -0,0 +1,134 @@
+# sections.py — class sections sharing one deployment, each with its own PIN, unlocks, scenario
+# pack, caches and quotas
+#
+# SECTIONS_FILE names a JSON file such as
+#   {"mon-am": {"pin": "4821", "events": "packs/retail.json", "max_sessions": 80, "max_inflight": 4,
+#               "dataset_cache_mb": 32, "replay_cache_mb": 32,
+#               "unlock_at": {"2": "2026-10-19T09:00:00-04:00", "3": "2026-10-26T09:00:00-04:00"}},
+#    "tue-pm": {"pin": "7310"}}
+# "events" is a scenario pack in the events_config.EVENTS schema (the built-in pack when omitted).
+# "unlock_at" unlocks weeks automatically at the given times (ISO 8601 or unix time; see
+# control_plane.UnlockScheduler).
+# max_sessions caps a section's concurrent sessions across all workers; max_inflight caps its
+# transform-heavy callbacks running at once in one worker, so a large section queues on its own
+# slots instead of occupying every thread of the shared pool (0, the default, means unlimited).
+# Without SECTIONS_FILE there is a single section, "default", using INSTRUCTOR_PIN and the
+# UNLOCK_SCHEDULE JSON ({"2": "2026-10-19T09:00:00-04:00", ...}).
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import pandas as pd
+
+from class_stats import ClassStats
+from control_plane import WEEKS, SessionLeases, UnlockStore, VersionWatcher, parse_time
+from datasets import DatasetCache
+from events_config import EVENTS
+from events_engine import FUNCTIONS, compile_events
+from replay import Replayer
+
+DEFAULT = "default"
+OPTIONS = {"pin", "events", "max_sessions", "max_inflight", "dataset_cache_mb", "replay_cache_mb", "unlock_at"}
+
+
+class SectionBusy(RuntimeError):
+    """All of the section's transform slots in this worker stayed taken for ``slot_wait`` seconds."""
+
+
+def load_pack(path: str) -> Dict[str, Any]:
+    """A scenario pack from JSON, checked to cover only the weeks the UI offers and to compile."""
+    with open(path) as fh:
+        events = json.load(fh)
+    unknown = set(events) - set(WEEKS)
+    if unknown:
+        raise ValueError(f"{path}: weeks must be among {WEEKS}, got {sorted(unknown)}")
+    transforms = compile_events(events)
+    missing = [c["transform"] for ev in events.values() for c in ev["choices"] if c["transform"] not in transforms]
+    if missing:
+        raise ValueError(f"{path}: choices without effects: {missing}")
+    return events
+
+
+class Section:
+    """Everything one class section owns on a shared deployment."""
+
+    def __init__(self, key: str, pin: str, load_base: Callable[[Dict[str, Any]], pd.DataFrame], *,
+                 events: Dict[str, Any] = None, control_db: str = "control.db", stats_db: str = None,
+                 max_sessions: int = 0, max_inflight: int = 0, dataset_cache_mb: float = 64,
+                 replay_cache_mb: float = 64, spill_dir: str = None, slot_wait: float = 2.0,
+                 unlock_at: Dict[str, Any] = None):
+        self.key = key
+        self.pin = pin
+        self.unlock_at = {str(w): parse_time(at) for w, at in (unlock_at or {}).items()}
+        self.events = EVENTS if events is None else events
+        self.transforms = FUNCTIONS if events is None else compile_events(events)
+        self.datasets = DatasetCache(int(dataset_cache_mb * 2 ** 20), spill_dir)
+        self.replayer = Replayer.from_env(load_base, self.transforms, replay_cache_mb)
+        self.control = UnlockStore(control_db, key)
+        self.watcher = VersionWatcher(self.control)
+        self.stats = ClassStats(stats_db or control_db, key)
+        self.leases = SessionLeases(control_db, key, max_sessions)
+        self.slot_wait = slot_wait
+        self._slots = threading.BoundedSemaphore(max_inflight) if max_inflight else None
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the section's in-flight slots for the enclosed work; raises SectionBusy."""
+        if self._slots is None:
+            yield
+            return
+        if not self._slots.acquire(timeout=self.slot_wait):
+            raise SectionBusy(f"Section {self.key} is busy, please try again in a moment.")
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+
+class Sections:
+    """Sections by key; ``get(None)`` and ``get("")`` are the default section."""
+
+    def __init__(self, sections: Dict[str, Section]):
+        self._sections = sections
+
+    def get(self, key: Optional[str]) -> Optional[Section]:
+        return self._sections.get(key or DEFAULT)
+
+    def __iter__(self) -> Iterator[Section]:
+        return iter(self._sections.values())
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+    @classmethod
+    def from_env(cls, load_base) -> "Sections":
+        shared = {
+            "control_db": os.environ.get("CONTROL_DB", "control.db"),
+            "stats_db": os.environ.get("CLASS_STATS_DB") or None,
+            "spill_dir": os.environ.get("DATASET_SPILL_DIR") or None,
+        }
+        defaults = {
+            "pin": os.environ.get("INSTRUCTOR_PIN", "D4U2025"),
+            "dataset_cache_mb": float(os.environ.get("DATASET_CACHE_MB", "64")),
+            "replay_cache_mb": float(os.environ.get("REPLAY_CACHE_MB", "64")),
+        }
+        schedule = json.loads(os.environ.get("UNLOCK_SCHEDULE") or "{}")
+        path = os.environ.get("SECTIONS_FILE")
+        if not path:
+            return cls({DEFAULT: Section(DEFAULT, defaults.pop("pin"), load_base, unlock_at=schedule, **defaults, **shared)})
+        with open(path) as fh:
+            config = json.load(fh)
+        sections = {}
+        for key, options in config.items():
+            unknown = set(options) - OPTIONS
+            if unknown:
+                raise ValueError(f"Section {key}: unknown options {sorted(unknown)}")
+            if "pin" not in options:
+                raise ValueError(f"Section {key}: a pin is required")
+            options = {**defaults, **options}
+            if "events" in options:
+                options["events"] = load_pack(os.path.join(os.path.dirname(path), options["events"]))
+            sections[key] = Section(key, options.pop("pin"), load_base, **options, **shared)
+        return cls(sections)
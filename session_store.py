@@ -0,0 +1,151 @@
+# session_store.py — server-side simulation sessions keyed by session id
+import os
+import pickle
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import pandas as pd
+
+from caching import frame_version
+from dbconn import pool
+from wire import decode_frame, encode_frame, is_encoded
+
+
+class SQLiteBackend:
+    """Durable backend: one row per session, pickled record with its DataFrames in the columnar
+    ``wire`` encoding (about 3x smaller than pickled frames). Safe to share between processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = pool(path).connection
+        with self._db() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS sessions (sid TEXT PRIMARY KEY, record BLOB NOT NULL)")
+
+    @staticmethod
+    def _decode(blob: bytes) -> Dict[str, Any]:
+        return {k: decode_frame(v) if is_encoded(v) else v for k, v in pickle.loads(blob).items()}
+
+    def get(self, sid: str) -> Optional[Dict[str, Any]]:
+        with self._db() as conn:
+            row = conn.execute("SELECT record FROM sessions WHERE sid = ?", (sid,)).fetchone()
+        return None if row is None else self._decode(row[0])
+
+    def scan(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Every ``(sid, record)``, decoded one row at a time."""
+        conn = sqlite3.connect(self.path, timeout=30)  # own connection: the cursor stays open between yields
+        try:
+            for sid, blob in conn.execute("SELECT sid, record FROM sessions ORDER BY sid"):
+                yield sid, self._decode(blob)
+        finally:
+            conn.close()
+
+    def set(self, sid: str, record: Dict[str, Any]) -> None:
+        packed = {k: encode_frame(v, b64=False) if isinstance(v, pd.DataFrame) else v for k, v in record.items()}
+        blob = pickle.dumps(packed, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._db() as conn:
+            conn.execute("INSERT OR REPLACE INTO sessions (sid, record) VALUES (?, ?)", (sid, blob))
+
+    def delete(self, sid: str) -> None:
+        with self._db() as conn:
+            conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+
+class SessionStore:
+    """In-process LRU of session records, optionally written through to a durable backend.
+
+    ``capacity`` bounds the cache only in front of a backend; without one the cache is the only
+    copy, so nothing is evicted (an event-sourced record is a few kilobytes).
+
+    A record is ``{"data": DataFrame, "history": [...], "rev": int, "version": str}``. Callers bump
+    ``rev`` on every change and keep it in the browser state, so a caller holding a rev the cached
+    copy doesn't match (e.g. another worker wrote it) falls through to the backend. ``version`` is
+    the content hash of ``data`` (filled in on save when absent) and keys derived caches.
+
+    With ``materialize``, records that carry ``decisions`` (see replay.py) are kept and persisted
+    without ``data``; ``load`` returns a copy with ``data`` rebuilt by ``materialize(record)``.
+    """
+
+    def __init__(self, capacity: int = 256, backend=None,
+                 materialize: Callable[[Dict[str, Any]], pd.DataFrame] = None):
+        self.capacity = capacity
+        self.backend = backend
+        self.materialize = materialize
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, materialize=None) -> "SessionStore":
+        capacity = int(os.environ.get("SESSION_CACHE_SIZE", "256"))
+        kind = os.environ.get("SESSION_BACKEND", "memory").lower()
+        if kind == "sqlite":
+            return cls(capacity, SQLiteBackend(os.environ.get("SESSION_DB", "sessions.db")), materialize)
+        if kind != "memory":
+            raise ValueError(f"Unknown SESSION_BACKEND: {kind}")
+        return cls(capacity, materialize=materialize)
+
+    def _replayed(self, record: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if record is None or "data" in record or "decisions" not in record or self.materialize is None:
+            return record
+        return {**record, "data": self.materialize(record)}
+
+    def _remember(self, sid: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._cache[sid] = record
+            self._cache.move_to_end(sid)
+            while self.backend is not None and len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def create(self, df: pd.DataFrame, sid: str = None, **extra: Any) -> str:
+        sid = sid or self.new_id()
+        self.save(sid, {"data": df, "history": [], "rev": 0, **extra})
+        return sid
+
+    def load(self, sid: str, rev: Optional[int] = None, materialize: bool = True) -> Optional[Dict[str, Any]]:
+        """The session's record; ``materialize=False`` skips rebuilding ``data`` for callers that
+        only need the base spec, history or rev."""
+        finish = self._replayed if materialize else (lambda r: r)
+        with self._lock:
+            record = self._cache.get(sid)
+            if record is not None and (rev is None or record["rev"] == rev):
+                self._cache.move_to_end(sid)
+                return finish(record)
+        if self.backend is None:
+            return finish(record)
+        record = self.backend.get(sid)
+        if record is not None:
+            self._remember(sid, record)
+        return finish(record)
+
+    def save(self, sid: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        if "version" not in record:
+            record = {**record, "version": frame_version(record["data"])}
+        stored = record
+        if "decisions" in record and self.materialize is not None:
+            stored = {k: v for k, v in record.items() if k != "data"}
+        if self.backend is not None:
+            self.backend.set(sid, stored)
+        self._remember(sid, stored)
+        return record
+
+    def scan(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Every stored ``(sid, record)`` as saved (event-sourced records without ``data``): all of
+        the backend's sessions when there is one, else this process's cache."""
+        if self.backend is not None:
+            yield from self.backend.scan()
+            return
+        with self._lock:
+            items = list(self._cache.items())
+        yield from items
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._cache.pop(sid, None)
+        if self.backend is not None:
+            self.backend.delete(sid)
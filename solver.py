@@ -0,0 +1,133 @@
+# solver.py — enumerate (or beam-search) decision paths through the weekly events
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+from data_generation import generate_data
+from events_config import EVENTS
+from events_engine import FUNCTIONS, apply_transform, compile_events
+
+METRICS = ["Profit", "Revenue", "GM %"]
+
+def _transforms(events: Dict[str, Any]):
+    return FUNCTIONS if events is EVENTS else compile_events(events)
+
+def _weeks(events: Dict[str, Any]) -> List[str]:
+    return sorted(events, key=int)
+
+def final_metrics(df: pd.DataFrame) -> Dict[str, float]:
+    """Whole-horizon KPIs, computed like the 12-month KPI cards."""
+    revenue = float(df["Sales Revenue"].sum())
+    cogs = float(df["COGS"].sum())
+    return {
+        "Profit": round(float(df["Profit"].sum()), 2),
+        "Revenue": round(revenue, 2),
+        "GM %": round((revenue - cogs) / revenue * 100.0, 4) if revenue else 0.0,
+    }
+
+def _expand(df: pd.DataFrame, prefix: Tuple[str, ...], weeks: List[str], events, transforms) -> list:
+    """Depth-first walk below ``prefix``: every distinct prefix is transformed exactly once and only
+    the current branch's frames are alive at any time."""
+    if not weeks:
+        return [(prefix, final_metrics(df))]
+    results = []
+    for choice in events[weeks[0]]["choices"]:
+        out = apply_transform(df, choice["transform"], transforms)[0]
+        results.extend(_expand(out, prefix + (choice["id"],), weeks[1:], events, transforms))
+    return results
+
+def _expand_job(args) -> list:
+    df, prefix, weeks, events = args
+    return _expand(df, prefix, weeks, events, _transforms(events))
+
+def _children(state, week: str, events, transforms):
+    prefix, df = state
+    return [(prefix + (c["id"],), apply_transform(df, c["transform"], transforms)[0])
+            for c in events[week]["choices"]]
+
+def _children_job(args) -> list:
+    states, week, events = args
+    transforms = _transforms(events)
+    return [c for state in states for c in _children(state, week, events, transforms)]
+
+def _frontier(df: pd.DataFrame, weeks: List[str], events, transforms, min_size: int):
+    """Expand breadth-first until there are at least ``min_size`` prefixes to hand out."""
+    frontier, depth = [((), df)], 0
+    while len(frontier) < min_size and depth < len(weeks):
+        frontier = [child for state in frontier for child in _children(state, weeks[depth], events, transforms)]
+        depth += 1
+    return frontier, weeks[depth:]
+
+def _to_frame(results, weeks: List[str]) -> pd.DataFrame:
+    rows = [{**{f"Week {w}": c for w, c in zip(weeks, prefix)}, **metrics} for prefix, metrics in results]
+    return pd.DataFrame(rows, columns=[f"Week {w}" for w in weeks] + METRICS)
+
+def enumerate_paths(seed: int = 42, df: pd.DataFrame = None, events: Dict[str, Any] = None,
+                    processes: int = None) -> pd.DataFrame:
+    """Final KPIs of every decision path (3^6 = 729 for the default pack), one row per path.
+
+    ``processes`` > 1 splits the tree at a frontier of prefixes and expands the subtrees in a
+    process pool.
+    """
+    events = EVENTS if events is None else events
+    transforms = _transforms(events)
+    df = generate_data(seed) if df is None else df
+    weeks = _weeks(events)
+    if not processes or processes <= 1:
+        return _to_frame(_expand(df, (), weeks, events, transforms), weeks)
+    frontier, rest = _frontier(df, weeks, events, transforms, 2 * processes)
+    with ProcessPoolExecutor(processes) as pool:
+        parts = pool.map(_expand_job, [(state, prefix, rest, events) for prefix, state in frontier])
+        return _to_frame([r for part in parts for r in part], weeks)
+
+def beam_search(seed: int = 42, df: pd.DataFrame = None, events: Dict[str, Any] = None,
+                beam_width: int = 50, score: str = "Profit", processes: int = None) -> pd.DataFrame:
+    """Keep only the ``beam_width`` best prefixes (by ``score``) after each week.
+
+    For scenario packs too large to enumerate; returns the surviving full paths like
+    ``enumerate_paths``.
+    """
+    if score not in METRICS:
+        raise ValueError(f"score must be one of {METRICS}")
+    events = EVENTS if events is None else events
+    transforms = _transforms(events)
+    df = generate_data(seed) if df is None else df
+    weeks = _weeks(events)
+    frontier, scored = [((), df)], [((), df, final_metrics(df))]
+    pool = ProcessPoolExecutor(processes) if processes and processes > 1 else None
+    try:
+        for i, week in enumerate(weeks):
+            if pool is None:
+                children = [c for state in frontier for c in _children(state, week, events, transforms)]
+            else:
+                size = -(-len(frontier) // processes)
+                jobs = [(frontier[j:j + size], week, events) for j in range(0, len(frontier), size)]
+                children = [c for part in pool.map(_children_job, jobs) for c in part]
+            scored = [(prefix, state, final_metrics(state)) for prefix, state in children]
+            if i < len(weeks) - 1:
+                scored.sort(key=lambda t: t[2][score], reverse=True)
+                scored = scored[:beam_width]
+            frontier = [(prefix, state) for prefix, state, _ in scored]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return _to_frame([(prefix, metrics) for prefix, _, metrics in scored], weeks)
+
+def distribution(paths: pd.DataFrame) -> pd.DataFrame:
+    """Percentile summary of the final metrics across paths."""
+    return paths[METRICS].describe(percentiles=[0.05, 0.25, 0.5, 0.75, 0.95])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enumerate decision paths for one generate_data seed.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--beam", type=int, default=None, help="beam width (default: enumerate every path)")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+    if args.beam:
+        paths = beam_search(args.seed, beam_width=args.beam, processes=args.processes)
+    else:
+        paths = enumerate_paths(args.seed, processes=args.processes)
+    print(distribution(paths).to_string())
+    print(paths.sort_values("Profit", ascending=False).head(5).to_string(index=False))
@@ -0,0 +1,199 @@
+# sweep.py — Monte-Carlo seed sweep of decision paths for calibrating events_engine multipliers
+#
+#   python sweep.py --seeds 5000 --path AAAAAA --path BBBBBB --out sweep.csv --processes 8
+#
+# Each row of the output is one (seed, path, week) with that week's _delta_summary values; the
+# percentile bands per (path, week) are printed (and written with --report) at the end.
+import argparse
+import csv
+import itertools
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from data_generation import generate_data
+from events_config import EVENTS
+from events_engine import apply_transform
+
+DELTA_KEYS = ["Sales Quantity", "Sales Revenue", "COGS", "Profit", "Inventory Quantity",
+              "Marketing Dollars", "Revenue %", "Profit %"]
+COLUMNS = ["seed", "path", "week", "choice"] + DELTA_KEYS
+PERCENTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+def _weeks() -> List[str]:
+    return sorted(EVENTS, key=int)
+
+def parse_path(path: str) -> List[Dict]:
+    """``"ABCABC"`` -> the chosen EVENTS choice for each week, in week order."""
+    weeks = _weeks()
+    if len(path) != len(weeks):
+        raise ValueError(f"Path {path!r} needs one choice per week ({len(weeks)})")
+    choices = []
+    for week, cid in zip(weeks, path):
+        by_id = {c["id"]: c for c in EVENTS[week]["choices"]}
+        if cid not in by_id:
+            raise ValueError(f"Path {path!r}: week {week} has no choice {cid!r}")
+        choices.append(by_id[cid])
+    return choices
+
+def all_paths() -> List[str]:
+    ids = [[c["id"] for c in EVENTS[w]["choices"]] for w in _weeks()]
+    return ["".join(p) for p in itertools.product(*ids)]
+
+def run_seed(seed: int, paths: List[str], scale: Dict) -> List[list]:
+    """Rows for every path on one seed. Paths are walked in sorted order keeping only the current
+    chain of states, so a prefix shared with the previous path is never recomputed."""
+    base = generate_data(seed, **scale)
+    weeks = _weeks()
+    chain = []  # [(choice id, df after, delta)] for the previous path
+    rows = []
+    for path in sorted(paths):
+        keep = 0
+        while keep < len(chain) and chain[keep][0] == path[keep]:
+            keep += 1
+        del chain[keep:]
+        for week, choice in list(zip(weeks, parse_path(path)))[keep:]:
+            df = chain[-1][1] if chain else base
+            out, delta, _ = apply_transform(df, choice["transform"])
+            chain.append((choice["id"], out, delta))
+        for week, (cid, _, delta) in zip(weeks, chain):
+            rows.append([seed, path, int(week), cid] + [delta[k] for k in DELTA_KEYS])
+    return rows
+
+def _run_chunk(args) -> List[list]:
+    seeds, paths, scale = args
+    return [row for seed in seeds for row in run_seed(seed, paths, scale)]
+
+class _CsvSink:
+    def __init__(self, path: str):
+        self._fh = open(path, "w", newline="")
+        self._writer = csv.writer(self._fh)
+        self._writer.writerow(COLUMNS)
+
+    def write(self, rows: List[list]) -> None:
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._fh.close()
+
+class _ParquetSink:
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)") from exc
+        self._pa = pa
+        self._writer = pq.ParquetWriter(path, pa.schema(
+            [("seed", pa.int64()), ("path", pa.string()), ("week", pa.int64()), ("choice", pa.string())]
+            + [(k, pa.float64()) for k in DELTA_KEYS]
+        ))
+
+    def write(self, rows: List[list]) -> None:
+        self._writer.write_table(self._pa.Table.from_pandas(pd.DataFrame(rows, columns=COLUMNS), preserve_index=False))
+
+    def close(self) -> None:
+        self._writer.close()
+
+def _chunks(seeds: List[int], size: int) -> Iterable[List[int]]:
+    for i in range(0, len(seeds), size):
+        yield seeds[i:i + size]
+
+def run_sweep(seeds: List[int], paths: List[str], out: str, processes: int = None,
+              chunk_size: int = 50, scale: Dict = None) -> None:
+    """Stream sweep rows to ``out`` (.csv or .parquet) chunk by chunk as workers finish them.
+
+    At most two chunks per process are in flight, so memory stays bounded however many seeds are
+    swept; rows land in completion order, not seed order.
+    """
+    for path in paths:
+        parse_path(path)
+    scale = scale or {}
+    sink = _ParquetSink(out) if out.endswith(".parquet") else _CsvSink(out)
+    jobs = ((chunk, paths, scale) for chunk in _chunks(list(seeds), chunk_size))
+    try:
+        if processes and processes > 1:
+            with ProcessPoolExecutor(processes) as pool:
+                pending = set()
+                for job in jobs:
+                    if len(pending) >= 2 * processes:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            sink.write(future.result())
+                    pending.add(pool.submit(_run_chunk, job))
+                for future in as_completed(pending):
+                    sink.write(future.result())
+        else:
+            for job in jobs:
+                sink.write(_run_chunk(job))
+    finally:
+        sink.close()
+
+def _read_batches(out: str, columns: List[str], batch_size: int = 100_000) -> Iterator[pd.DataFrame]:
+    if out.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise RuntimeError("Parquet input needs pyarrow (pip install pyarrow)") from exc
+        for batch in pq.ParquetFile(out).iter_batches(batch_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(out, usecols=columns, chunksize=batch_size)
+
+def percentile_bands(out: str) -> pd.DataFrame:
+    """p5/p25/p50/p75/p95 of every delta metric per (path, week), read back from ``out``.
+
+    ``out`` is read in batches keeping only the delta values as float arrays per (path, week);
+    seed and choice columns and the per-row path strings are never held for the whole sweep.
+    """
+    groups: Dict[tuple, List[np.ndarray]] = {}
+    for batch in _read_batches(out, ["path", "week"] + DELTA_KEYS):
+        for key, part in batch.groupby(["path", "week"], sort=False):
+            groups.setdefault((key[0], int(key[1])), []).append(part[DELTA_KEYS].to_numpy(np.float64))
+    rows, index = [], []
+    for key in sorted(groups):
+        values = np.nanquantile(np.concatenate(groups.pop(key)), PERCENTILES, axis=0)
+        rows.extend(values)
+        index.extend(key + (q,) for q in PERCENTILES)
+    return pd.DataFrame(rows, columns=DELTA_KEYS,
+                        index=pd.MultiIndex.from_tuples(index, names=["path", "week", "percentile"]))
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run decision paths over many generate_data seeds.")
+    parser.add_argument("--seeds", type=int, default=1000, help="number of seeds")
+    parser.add_argument("--seed-start", type=int, default=0)
+    parser.add_argument("--path", action="append", dest="paths",
+                        help="choice per week, e.g. ABCABC (repeatable; default AAAAAA/BBBBBB/CCCCCC)")
+    parser.add_argument("--all-paths", action="store_true", help="every path through the events")
+    parser.add_argument("--out", default="sweep.csv", help=".csv or .parquet")
+    parser.add_argument("--report", default=None, help="write the percentile bands to this CSV")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=50)
+    parser.add_argument("--n-items", type=int, default=None)
+    parser.add_argument("--n-stores", type=int, default=None)
+    parser.add_argument("--n-months", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.all_paths:
+        paths = all_paths()
+    else:
+        paths = args.paths or [c * len(_weeks()) for c in "ABC"]
+    scale = {k: v for k, v in (("n_items", args.n_items), ("n_stores", args.n_stores),
+                               ("n_months", args.n_months)) if v is not None}
+    if scale:
+        scale["compat"] = False
+    seeds = range(args.seed_start, args.seed_start + args.seeds)
+    try:
+        run_sweep(seeds, paths, args.out, processes=args.processes, chunk_size=args.chunk_size, scale=scale)
+    except (ValueError, RuntimeError) as exc:
+        parser.error(str(exc))
+    bands = percentile_bands(args.out)
+    if args.report:
+        bands.to_csv(args.report)
+    with pd.option_context("display.width", 250, "display.max_rows", 200, "display.max_columns", None):
+        print(bands[["Revenue %", "Profit %", "Profit"]].unstack("percentile").round(2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# table_query.py — server-side filter / sort / paging for the raw-data DataTable (custom actions)
+import math
+import operator
+import os
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from caching import LRUCache
+
+# Columns with a value -> row positions index; filters on them test the distinct values only.
+INDEXED = ["Month", "Item", "Category", "Store"]
+INDEXES = LRUCache(int(os.environ.get("TABLE_INDEX_CACHE_SIZE", "64")))
+
+_COMPARE = {
+    "=": operator.eq, "eq": operator.eq, "!=": operator.ne, "ne": operator.ne,
+    "<": operator.lt, "lt": operator.lt, "<=": operator.le, "le": operator.le,
+    ">": operator.gt, "gt": operator.gt, ">=": operator.ge, "ge": operator.ge,
+}
+_TEXT = {"contains", "datestartswith"}
+_PART = re.compile(r"^\{(?P<col>[^}]+)\}\s+(?P<op>\S+)\s+(?P<value>.+)$")
+
+
+def parse_filter(query: str) -> List[Tuple[str, str, str, bool]]:
+    """DataTable ``filter_query`` -> [(column, operator, value, case_sensitive)].
+
+    Understands the ``&&``-joined ``{col} op value`` clauses the filter row produces, including
+    the ``s``/``i`` (case-sensitive/insensitive) operator prefixes.
+    """
+    clauses = []
+    for part in filter(None, (p.strip() for p in (query or "").split(" && "))):
+        m = _PART.match(part)
+        if m is None:
+            raise ValueError(f"Unsupported filter clause: {part!r}")
+        op, value, case = m["op"], m["value"].strip(), True
+        if op not in _COMPARE and op not in _TEXT and op[:1] in ("s", "i"):
+            op, case = op[1:], op[0] == "s"
+        if op not in _COMPARE and op not in _TEXT:
+            raise ValueError(f"Unsupported filter operator: {m['op']!r}")
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'`":
+            value = value[1:-1]
+        clauses.append((m["col"], op, value, case))
+    return clauses
+
+
+def _matches(op: str, left, right) -> bool:
+    if op == "contains":
+        return right in str(left)
+    if op == "datestartswith":
+        return str(left).startswith(right)
+    return _COMPARE[op](left, right)
+
+
+def _mask(col: pd.Series, op: str, value: str, case: bool) -> np.ndarray:
+    if col.dtype.kind in "biuf" and op not in _TEXT:
+        try:
+            number = float(value)
+        except ValueError:
+            raise ValueError(f"{col.name} needs a number, got {value!r}") from None
+        return _COMPARE[op](col.to_numpy(), number)
+    text = col.astype(str)
+    if not case:
+        text, value = text.str.lower(), value.lower()
+    if op == "contains":
+        return text.str.contains(value, regex=False).to_numpy()
+    if op == "datestartswith":
+        return text.str.startswith(value).to_numpy()
+    return _COMPARE[op](text, value).to_numpy()
+
+
+class FrameIndex:
+    """A frame plus per-column position indexes for ``INDEXED`` columns."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.positions: Dict[str, Dict] = {
+            col: df.groupby(col, sort=False).indices for col in INDEXED if col in df.columns
+        }
+
+    def _indexed_rows(self, col: str, op: str, value: str, case: bool) -> np.ndarray:
+        index = self.positions[col]
+        if self.df[col].dtype.kind in "biuf" and op not in _TEXT:
+            try:
+                number = float(value)
+            except ValueError:
+                raise ValueError(f"{col} needs a number, got {value!r}") from None
+            keys = [k for k in index if _COMPARE[op](k, number)]
+        else:
+            fold = (lambda s: s) if case else str.lower
+            keys = [k for k in index if _matches(op, fold(str(k)), fold(value))]
+        return np.concatenate([index[k] for k in keys]) if keys else np.empty(0, dtype=np.intp)
+
+    def query(self, filter_query: str = "", sort_by=None, page: int = 0,
+              page_size: int = 12) -> Tuple[List[Dict], int, int]:
+        """(records of the requested page, page count, page actually returned)."""
+        rows, rest = None, []
+        for col, op, value, case in parse_filter(filter_query):
+            if col not in self.df.columns:
+                raise ValueError(f"Unknown column: {col!r}")
+            if col in self.positions:
+                found = self._indexed_rows(col, op, value, case)
+                rows = found if rows is None else np.intersect1d(rows, found, assume_unique=True)
+            else:
+                rest.append((col, op, value, case))
+        view = self.df if rows is None else self.df.iloc[np.sort(rows)]
+        for col, op, value, case in rest:
+            view = view[_mask(view[col], op, value, case)]
+        if sort_by:
+            view = view.sort_values([s["column_id"] for s in sort_by],
+                                    ascending=[s["direction"] == "asc" for s in sort_by], kind="stable")
+        page_count = max(1, math.ceil(len(view) / page_size))
+        page = min(max(page or 0, 0), page_count - 1)
+        return view.iloc[page * page_size:(page + 1) * page_size].to_dict("records"), page_count, page
+
+
+def frame_index(version: str, df: pd.DataFrame) -> FrameIndex:
+    """Shared FrameIndex for a data version (sessions on identical data reuse it)."""
+    return INDEXES.get_or_build(version, lambda: FrameIndex(df))
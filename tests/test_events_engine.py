@@ -0,0 +1,62 @@
+import numpy as np
+import pandas.testing as pdt
+import pytest
+
+import legacy_events_engine as legacy
+from data_generation import generate_data
+from events_config import EVENTS
+from events_engine import FUNCTIONS, _apply_on_latest
+
+SEEDS = [1, 7, 42, 2025, 31337]
+
+
+def _with_zero_quantities(df):
+    df = df.copy()
+    latest = np.flatnonzero(df["Month"].eq(df["Month"].max()).to_numpy())
+    df.loc[df.index[latest[::3]], "Sales Quantity"] = 0
+    return df
+
+
+def _frames():
+    for seed in SEEDS:
+        df = generate_data(seed, end_month="2025-06")
+        yield f"{seed}", df
+        yield f"{seed}-zero", _with_zero_quantities(df)
+    yield "stores", generate_data(5, n_items=20, n_stores=3, n_months=6, compat=False, end_month="2025-06")
+
+
+FRAMES = dict(_frames())
+
+
+def test_every_legacy_transform_is_compiled():
+    assert set(FUNCTIONS) == set(legacy.FUNCTIONS)
+
+
+@pytest.mark.parametrize("frame", FRAMES)
+@pytest.mark.parametrize("name", sorted(legacy.FUNCTIONS))
+def test_transform_matches_legacy(frame, name):
+    df = FRAMES[frame]
+    out, delta, feedback = FUNCTIONS[name](df)
+    want_out, want_delta, want_feedback = legacy.FUNCTIONS[name](df)
+    pdt.assert_frame_equal(out, want_out)
+    assert delta == want_delta
+    assert feedback == want_feedback
+
+
+@pytest.mark.parametrize("frame", FRAMES)
+def test_apply_on_latest_matches_legacy(frame):
+    df = FRAMES[frame]
+    mask = df["Category"].isin(["Tops", "Bottoms"])
+    kwargs = dict(qty_mult=0.93, price_mult=1.07, cost_mult=0.98, inv_delta_pct=-0.11, mkt_delta_mult=1.3)
+    pdt.assert_frame_equal(_apply_on_latest(df, mask, **kwargs), legacy._apply_on_latest(df, mask, **kwargs))
+
+
+@pytest.mark.parametrize("frame", FRAMES)
+@pytest.mark.parametrize("path", ["AAAAAA", "BBBBBB", "CCCCCC", "ABCABC", "CBACBA"])
+def test_chained_weeks_match_legacy(frame, path):
+    fused = reference = FRAMES[frame]
+    for week, letter in zip(range(2, 8), path):
+        name = next(c["transform"] for c in EVENTS[str(week)]["choices"] if c["id"] == letter)
+        fused = FUNCTIONS[name](fused)[0]
+        reference = legacy.FUNCTIONS[name](reference)[0]
+        pdt.assert_frame_equal(fused, reference)
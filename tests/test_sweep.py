@@ -0,0 +1,30 @@
+import pandas as pd
+import pandas.testing as pdt
+
+import sweep
+
+PATHS = ["AAAAAA", "ABCABC", "CCCCCC"]
+
+
+def _reference_bands(out):
+    df = pd.read_csv(out)
+    bands = df.groupby(["path", "week"])[sweep.DELTA_KEYS].quantile(sweep.PERCENTILES)
+    bands.index = bands.index.set_names("percentile", level=-1)
+    return bands
+
+
+def test_parallel_sweep_writes_every_row(tmp_path):
+    serial, parallel = tmp_path / "serial.csv", tmp_path / "parallel.csv"
+    sweep.run_sweep(range(12), PATHS, str(serial), chunk_size=2)
+    sweep.run_sweep(range(12), PATHS, str(parallel), processes=2, chunk_size=1)
+    got = pd.read_csv(parallel).sort_values(["seed", "path", "week"]).reset_index(drop=True)
+    pdt.assert_frame_equal(got, pd.read_csv(serial))
+
+
+def test_percentile_bands_match_pandas_across_batches(tmp_path, monkeypatch):
+    out = str(tmp_path / "sweep.csv")
+    sweep.run_sweep(range(10), PATHS, out)
+    want = _reference_bands(out)
+    pdt.assert_frame_equal(sweep.percentile_bands(out), want, check_index_type=False)
+    monkeypatch.setattr(sweep._read_batches, "__defaults__", (7,))
+    pdt.assert_frame_equal(sweep.percentile_bands(out), want, check_index_type=False)
@@ -0,0 +1,69 @@
+import pytest
+
+from components import raw_data_title
+from data_generation import generate_data
+from table_query import FrameIndex
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return generate_data(42, n_stores=12, n_items=3, n_months=4, compat=False)
+
+
+# Each filter_query with the same filter written in plain pandas.
+FILTERS = {
+    "": lambda df: df,
+    "{Store} > 9": lambda df: df[df["Store"] > 9],
+    "{Store} >= 2": lambda df: df[df["Store"] >= 2],
+    "{Store} < 10": lambda df: df[df["Store"] < 10],
+    "{Store} = 3": lambda df: df[df["Store"] == 3],
+    "{Store} != 11": lambda df: df[df["Store"] != 11],
+    "{Store} > 9 && {Category} = Tops": lambda df: df[(df["Store"] > 9) & (df["Category"] == "Tops")],
+    "{Item} contains a": lambda df: df[df["Item"].str.contains("a", regex=False)],
+    "{Item} icontains J": lambda df: df[df["Item"].str.lower().str.contains("j", regex=False)],
+    "{Month} datestartswith 2026": lambda df: df[df["Month"].str.startswith("2026")],
+    "{Profit} > 5000 && {Store} <= 4": lambda df: df[(df["Profit"] > 5000) & (df["Store"] <= 4)],
+    "{Sales Quantity} ge 100": lambda df: df[df["Sales Quantity"] >= 100],
+}
+SORTS = [
+    None,
+    [{"column_id": "Profit", "direction": "desc"}],
+    [{"column_id": "Item", "direction": "asc"}, {"column_id": "Sales Revenue", "direction": "desc"}],
+    [{"column_id": "Store", "direction": "desc"}],
+]
+
+
+def _reference(df, query, sort_by, page, page_size):
+    view = FILTERS[query](df)
+    if sort_by:
+        view = view.sort_values([s["column_id"] for s in sort_by],
+                                ascending=[s["direction"] == "asc" for s in sort_by], kind="stable")
+    return view.iloc[page * page_size:(page + 1) * page_size].to_dict("records")
+
+
+@pytest.mark.parametrize("sort_by", SORTS)
+@pytest.mark.parametrize("query", FILTERS)
+def test_query_matches_pandas(frame, query, sort_by):
+    index = FrameIndex(frame)
+    assert len(FILTERS[query](frame)) > 0
+    for page, page_size in [(0, len(frame)), (0, 12), (1, 12), (2, 5)]:
+        rows, _, current = index.query(query, sort_by, page, page_size)
+        if current == page:
+            assert rows == _reference(frame, query, sort_by, page, page_size)
+
+
+def test_page_is_clamped_to_the_last_page(frame):
+    rows, page_count, page = FrameIndex(frame).query("{Store} = 3", page=99, page_size=5)
+    assert page_count == -(-len(frame[frame["Store"] == 3]) // 5)
+    assert page == page_count - 1
+    assert rows == _reference(frame, "{Store} = 3", None, page, 5)
+
+
+def test_numeric_index_rejects_text(frame):
+    with pytest.raises(ValueError):
+        FrameIndex(frame).query("{Store} > abc")
+
+
+def test_raw_data_title_describes_the_frame(frame):
+    assert raw_data_title(generate_data(42)) == "Raw Data (12 months × 7 items)"
+    assert raw_data_title(frame) == "Raw Data (4 months × 3 items × 12 stores)"
@@ -0,0 +1,75 @@
+# unlock_push.py — push unlock-version changes to browsers (SSE with a long-poll fallback)
+import time
+from typing import Callable, Optional
+
+from flask import Response, abort, jsonify, request
+
+from control_plane import VersionWatcher
+
+
+def _client_version(default=None):
+    """Version the browser already has: Last-Event-ID (SSE reconnect) or If-None-Match (long-poll)."""
+    raw = request.headers.get("Last-Event-ID")
+    if raw is None and request.if_none_match:
+        raw = next(iter(request.if_none_match.as_set()), None)
+    if raw is None:
+        raw = request.args.get("since")
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return default
+
+
+def register_unlock_routes(server, watchers: Callable[[str], Optional[VersionWatcher]], *, max_wait: float = 25.0,
+                           heartbeat: float = 15.0, stream_ttl: float = 300.0) -> None:
+    """Add ``/unlock/events`` (text/event-stream) and ``/unlock/poll`` (ETag long-poll) to ``server``.
+
+    ``?section=`` picks the watcher via ``watchers(section)`` (404 when it returns None); the
+    default section is "default". Both only emit when that section's UnlockStore version moves.
+    Each open connection holds a greenlet under the gevent workers render.yaml runs (a whole
+    thread under gthread), and streams end after ``stream_ttl`` seconds so the browser reconnects
+    with Last-Event-ID and load spreads over workers.
+    """
+
+    def _watcher() -> VersionWatcher:
+        watcher = watchers(request.args.get("section") or "default")
+        if watcher is None:
+            abort(404)
+        return watcher
+
+    @server.route("/unlock/events")
+    def unlock_events():
+        watcher = _watcher()
+        since = _client_version()
+
+        def stream():
+            version = since
+            yield "retry: 3000\n\n"
+            if version is None or version != watcher.store.version():
+                version = watcher.store.version()
+                yield f"id: {version}\ndata: {version}\n\n"
+            deadline = time.monotonic() + stream_ttl
+            while time.monotonic() < deadline:
+                new = watcher.wait(version, heartbeat)
+                if new != version:
+                    version = new
+                    yield f"id: {version}\ndata: {version}\n\n"
+                else:
+                    yield ": keepalive\n\n"
+
+        return Response(stream(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    @server.route("/unlock/poll")
+    def unlock_poll():
+        watcher = _watcher()
+        since = _client_version()
+        wait = min(max(request.args.get("wait", max_wait, type=float), 0.0), max_wait)
+        version = watcher.store.version() if since is None else watcher.wait(since, wait)
+        if version == since:
+            resp = Response(status=304)
+        else:
+            resp = jsonify({"version": version})
+        resp.set_etag(str(version))
+        resp.headers["Cache-Control"] = "no-cache"
+        return resp
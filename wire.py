@@ -0,0 +1,69 @@
+# wire.py — compact columnar encoding of DataFrames (for session blobs and JSON stores)
+#
+#   {"n": rows, "index": [names] | None, "columns": [
+#       {"name": "Sales Revenue", "dtype": "<f8", "data": <buffer>},
+#       {"name": "Item", "categories": ["Dresses", ...], "dtype": "|i1", "data": <codes buffer>}]}
+#
+# Buffers are zlib-compressed NumPy bytes, base64 text when ``b64`` (JSON-safe, e.g. a dcc.Store).
+import base64
+import zlib
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+
+def _pack(arr: np.ndarray, b64: bool, level: int):
+    raw = zlib.compress(np.ascontiguousarray(arr).tobytes(), level)
+    return base64.b64encode(raw).decode("ascii") if b64 else raw
+
+
+def _unpack(data, dtype: str) -> np.ndarray:
+    raw = zlib.decompress(base64.b64decode(data) if isinstance(data, str) else data)
+    return np.frombuffer(bytearray(raw), dtype=np.dtype(dtype))  # bytearray: writable
+
+
+def _codes_dtype(n: int) -> np.dtype:
+    for dt in (np.int8, np.int16, np.int32):
+        if n <= np.iinfo(dt).max:
+            return np.dtype(dt)
+    return np.dtype(np.int64)
+
+
+def encode_frame(df: pd.DataFrame, b64: bool = True, level: int = 1) -> Dict[str, Any]:
+    """Columnar encoding of ``df``: numeric columns as raw buffers, everything else as
+    category codes + the distinct values. A non-default index is kept as leading columns."""
+    index = None
+    if not (isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1):
+        index = list(df.index.names)
+        if any(name is None for name in index) or df.index.nlevels != len(set(index)):
+            raise ValueError("encode_frame needs a RangeIndex or uniquely named index levels")
+        df = df.reset_index()
+    columns = []
+    for name in df.columns:
+        col = df[name]
+        if col.dtype.kind in "biuf":
+            columns.append({"name": name, "dtype": col.dtype.str, "data": _pack(col.to_numpy(), b64, level)})
+        else:
+            codes, categories = pd.factorize(col, use_na_sentinel=False)
+            codes = codes.astype(_codes_dtype(len(categories)))
+            columns.append({"name": name, "categories": categories.tolist(), "dtype": codes.dtype.str,
+                            "data": _pack(codes, b64, level)})
+    return {"n": len(df), "index": index, "columns": columns}
+
+
+def decode_frame(payload: Dict[str, Any]) -> pd.DataFrame:
+    """Inverse of ``encode_frame``. Numeric columns wrap the decompressed buffers without a further
+    copy; encoded text columns come back as plain text columns (not Categorical)."""
+    data = {}
+    for spec in payload["columns"]:
+        values = _unpack(spec["data"], spec["dtype"])
+        if "categories" in spec:
+            values = np.asarray(spec["categories"], dtype=object)[values]
+        data[spec["name"]] = values
+    df = pd.DataFrame(data, copy=False) if data else pd.DataFrame(index=range(payload["n"]))
+    return df.set_index(payload["index"]) if payload["index"] else df
+
+
+def is_encoded(value: Any) -> bool:
+    return isinstance(value, dict) and "columns" in value and "n" in value